@@ -9,6 +9,13 @@ import os
 from pathlib import Path
 from collections import defaultdict
 
+from facet_engine import FacetIndex, presence_facet
+from image_inventory import load_inventory
+
+def is_placeholder_image(product_image):
+    """Check if a product_image path points at the site's placeholder image."""
+    return 'product-image.jpg' in product_image or 'product-image.png' in product_image
+
 def analyze_product_images():
     """Analyze the product image database in detail."""
     
@@ -30,37 +37,29 @@ def analyze_product_images():
         print(f"❌ Error: {images_folder} folder not found!")
         return
     
-    # Get list of all image files in the images folder
-    image_files = set()
-    for ext in ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp']:
-        image_files.update([f.name for f in images_folder.glob(ext)])
+    # Image inventory, rescanned only when the images folder changed
+    inventory = load_inventory(images_folder)
+    image_files = set(inventory.files)
     
     # Categorize products
-    categories = defaultdict(list)
-    placeholder_products = []
-    actual_image_products = []
-    
-    for product in products:
-        product_id = product.get('product_id', 'Unknown')
-        product_name = product.get('product_name', 'Unknown')
-        category = product.get('category_name', 'Unknown')
-        product_image = product.get('product_image', '')
-        
-        # Categorize by image status
-        if 'product-image.jpg' in product_image or 'product-image.png' in product_image:
-            placeholder_products.append(product)
-        else:
-            actual_image_products.append(product)
-        
-        categories[category].append(product)
+    facets = FacetIndex(facets={
+        'category_name': lambda p: [p.get('category_name', 'Unknown')],
+        'placeholder': lambda p: [True] if is_placeholder_image(p.get('product_image', '')) else [],
+        'additional_images': presence_facet('additional_images'),
+    }).build(products)
+    
+    placeholder_bits = facets.filter(placeholder=True)
+    placeholder_products = facets.select(placeholder_bits)
+    actual_image_products = facets.select(facets.all_bits & ~placeholder_bits)
     
     # Print category analysis
     print("📊 PRODUCTS BY CATEGORY:")
     print("-" * 50)
-    for category, prods in sorted(categories.items()):
-        placeholder_count = sum(1 for p in prods if 'product-image.jpg' in p.get('product_image', ''))
-        actual_count = len(prods) - placeholder_count
-        print(f"{category}: {len(prods)} products ({actual_count} with images, {placeholder_count} placeholders)")
+    placeholder_counts = facets.facet_counts('category_name', within=placeholder_bits)
+    for category, count in sorted(facets.facet_counts('category_name').items()):
+        placeholder_count = placeholder_counts.get(category, 0)
+        actual_count = count - placeholder_count
+        print(f"{category}: {count} products ({actual_count} with images, {placeholder_count} placeholders)")
     
     print("\n" + "=" * 70)
     
@@ -83,14 +82,9 @@ def analyze_product_images():
     print(f"\n📁 ADDITIONAL IMAGES ANALYSIS:")
     print("-" * 50)
     
-    additional_images_count = 0
-    products_with_additional = 0
-    
-    for product in products:
-        additional_images = product.get('additional_images', [])
-        if additional_images:
-            products_with_additional += 1
-            additional_images_count += len(additional_images)
+    with_additional = facets.select(facets.filter(additional_images=True))
+    products_with_additional = len(with_additional)
+    additional_images_count = sum(len(p['additional_images']) for p in with_additional)
     
     print(f"Products with additional images: {products_with_additional}")
     print(f"Total additional images: {additional_images_count}")
@@ -110,8 +104,8 @@ def analyze_product_images():
         print(f"   {ext}: {count} files")
     
     # Primary vs Additional images
-    primary_images = [f for f in image_files if not '(' in f and not f.startswith('MBL-') == False]
-    additional_images = [f for f in image_files if '(' in f]
+    primary_images = [f for entry in inventory.products.values() for f in entry['primary'] if f.startswith('MBL-')]
+    additional_images = [f for entry in inventory.products.values() for names in entry['additional'].values() for f in names]
     
     print(f"\nPrimary product images: {len(primary_images)}")
     print(f"Additional product images: {len(additional_images)}")
@@ -168,3 +162,4 @@ if __name__ == "__main__":
         print("👍 Good image coverage!")
     else:
         print("⚠️  Consider improving image coverage")
+    print("🔬 Run image_quality.py to rank the photos by blur, brightness and background")
@@ -8,6 +8,8 @@ import json
 import os
 from pathlib import Path
 
+from image_inventory import load_inventory
+
 def check_primary_images():
     """Check if primary images exist for all products."""
     
@@ -29,10 +31,9 @@ def check_primary_images():
         print(f"❌ Error: {images_folder} folder not found!")
         return
     
-    # Get list of all image files in the images folder
-    image_files = set()
-    for ext in ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp']:
-        image_files.update([f.name for f in images_folder.glob(ext)])
+    # Image inventory, rescanned only when the images folder changed
+    inventory = load_inventory(images_folder)
+    image_files = set(inventory.files)
     
     missing_images = []
     found_images = []
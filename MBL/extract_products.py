@@ -13,6 +13,8 @@ from urllib.parse import urljoin, urlparse
 import time
 from datetime import datetime
 
+from facet_engine import FacetIndex, field_facet, presence_facet
+
 class McDonaldProductsExtractor:
     def __init__(self, html_file_path, base_url="https://www.mcdonaldbd.com"):
         self.html_file_path = html_file_path
@@ -318,17 +320,18 @@ class McDonaldProductsExtractor:
         print(f"Total Products: {len(self.products)}")
         
         # Count by category
-        categories = {}
-        for product in self.products:
-            category = product['category_name']
-            categories[category] = categories.get(category, 0) + 1
+        facets = FacetIndex(facets={
+            'category_name': field_facet('category_name'),
+            'product_url': presence_facet('product_url'),
+            'product_image': presence_facet('product_image'),
+        }).build(self.products)
         
         print("\n📋 Products by Category:")
-        for category, count in sorted(categories.items()):
+        for category, count in sorted(facets.facet_counts('category_name').items()):
             print(f"  {category}: {count} products")
         
-        print(f"\n🔗 Products with URLs: {sum(1 for p in self.products if p['product_url'])}")
-        print(f"🖼️ Products with Images: {sum(1 for p in self.products if p['product_image'])}")
+        print(f"\n🔗 Products with URLs: {facets.count(product_url=True)}")
+        print(f"🖼️ Products with Images: {facets.count(product_image=True)}")
         print("="*60)
 
 def main():
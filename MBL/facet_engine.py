@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Bitset Facet Engine
+Keeps one bitset per facet value (category_name, each crop, each pest,
+origin, isActive...) so filtered listings and facet counts are bitwise
+AND/OR plus popcount instead of Python loops over every product dict.
+
+Bitsets are Python ints: bit i is set when product i has the value. Only the
+words up to the highest set bit are stored, AND/OR/popcount run in C, and
+sparse values (a rare pest) stay small.
+
+Usage:
+    python facet_engine.py
+"""
+
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+_LIST_SPLIT_RE = re.compile(r'\s*[,;]\s*')
+
+
+def field_facet(field, split=False):
+    """Facet extractor returning the (optionally comma/semicolon separated) values of a field"""
+    def extract(product):
+        value = product.get(field)
+        if value is None:
+            return []
+        if isinstance(value, list):
+            return [str(item) for item in value]
+        value = str(value).strip()
+        if split:
+            return [part for part in _LIST_SPLIT_RE.split(value) if part]
+        return [value]
+    return extract
+
+
+def presence_facet(field):
+    """Facet extractor with a single True value for products where field is filled"""
+    def extract(product):
+        return [True] if product.get(field) else []
+    return extract
+
+
+# Facet name -> function returning the values a product has for that facet
+DEFAULT_FACETS = {
+    'category_name': field_facet('category_name'),
+    'crop': field_facet('crops', split=True),
+    'pest': field_facet('pest'),
+    'origin': field_facet('origin'),
+    'isActive': field_facet('isActive'),
+}
+
+
+def _bits_from_positions(positions):
+    """Build an int bitset in one pass instead of OR-ing growing ints per product"""
+    buffer = bytearray(positions[-1] // 8 + 1)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _facet_key(value):
+    # Case is kept: values differing only in case stay separate facets, as in the per-string summaries
+    return str(value).strip()
+
+
+class FacetIndex:
+    def __init__(self, facets=None):
+        self.facets = dict(DEFAULT_FACETS if facets is None else facets)
+        self.products = []
+        # facet -> value key (stripped string) -> bitset
+        self.bitsets = defaultdict(dict)
+        # facet -> value key -> display value
+        self.labels = defaultdict(dict)
+
+    @property
+    def all_bits(self):
+        return (1 << len(self.products)) - 1
+
+    def build(self, products):
+        """Index a list of product dicts"""
+        self.products = list(products)
+        for facet, extract in self.facets.items():
+            positions = defaultdict(list)
+            labels = self.labels[facet]
+            for position, product in enumerate(self.products):
+                for value in extract(product):
+                    key = _facet_key(value)
+                    positions[key].append(position)
+                    labels.setdefault(key, value)
+            for key, members in positions.items():
+                self.bitsets[facet][key] = _bits_from_positions(members)
+        return self
+
+    def bitset(self, facet, value):
+        """Bitset of products having value; a list/tuple/set of values is OR-ed"""
+        facet_bits = self.bitsets.get(facet, {})
+        if isinstance(value, (list, tuple, set, frozenset)):
+            bits = 0
+            for item in value:
+                bits |= facet_bits.get(_facet_key(item), 0)
+            return bits
+        return facet_bits.get(_facet_key(value), 0)
+
+    def filter(self, **criteria):
+        """AND together facet criteria, e.g. filter(category_name='Insecticides', crop='Rice')"""
+        bits = self.all_bits
+        for facet, value in criteria.items():
+            bits &= self.bitset(facet, value)
+            if not bits:
+                break
+        return bits
+
+    def count(self, **criteria):
+        return self.filter(**criteria).bit_count()
+
+    def facet_counts(self, facet, within=None, **criteria):
+        """
+        Count products per value of a facet, optionally inside a filtered set.
+
+        Args:
+            facet (str): Facet to count values of
+            within (int): Bitset to restrict the counts to
+            **criteria: Facet filters AND-ed into the restriction
+
+        Returns:
+            dict: Display value -> product count (values with no products are omitted)
+        """
+        scope = self.filter(**criteria)
+        if within is not None:
+            scope &= within
+        counts = {}
+        for key, bits in self.bitsets.get(facet, {}).items():
+            count = (bits & scope).bit_count()
+            if count:
+                counts[self.labels[facet][key]] = count
+        return counts
+
+    def select(self, bits):
+        """Products whose bits are set, in catalog order"""
+        selected = []
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+        for byte_index, byte in enumerate(data):
+            while byte:
+                low_bit = byte & -byte
+                selected.append(self.products[byte_index * 8 + low_bit.bit_length() - 1])
+                byte ^= low_bit
+        return selected
+
+
+def main():
+    products = []
+    for path in [Path("data/products_data.json"), Path("../imported_products/kb_english_products.json")]:
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                products.extend(json.load(f))
+
+    facets = FacetIndex().build(products)
+
+    print("🔍 FACET SUMMARY")
+    print("=" * 50)
+    print(f"Total products: {len(products)}")
+    for facet in ('category_name', 'crop', 'isActive'):
+        print(f"\n📋 Products by {facet}:")
+        for value, count in sorted(facets.facet_counts(facet).items(), key=lambda item: (-item[1], item[0]))[:10]:
+            print(f"  {value or '(empty)'}: {count}")
+
+    print(f"\nActive products on Rice: {facets.count(crop='Rice', isActive='true')}")
+    print(f"Rice + BPH (Brown Plant Hopper): {facets.count(crop='Rice', pest='BPH (Brown Plant Hopper)')}")
+
+
+if __name__ == "__main__":
+    main()
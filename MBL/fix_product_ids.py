@@ -7,6 +7,8 @@ import json
 import os
 from pathlib import Path
 
+from image_store import ImageStore
+
 def fix_product_ids():
     """Fix duplicate product IDs and create unique sequential IDs"""
     print("🔧 Fixing duplicate product IDs...")
@@ -17,6 +19,10 @@ def fix_product_ids():
     
     print(f"📊 Found {len(products)} products")
     
+    # (old image file name, new image file name); products with duplicate IDs
+    # can share an old file, and each then gets its own name for it
+    image_renames = []
+    
     # Create unique sequential IDs
     for i, product in enumerate(products, 1):
         old_id = product['product_id']
@@ -28,6 +34,7 @@ def fix_product_ids():
             old_filename = product['product_image'].split('/')[-1]
             new_filename = f"{new_id}.{old_filename.split('.')[-1]}"
             product['product_image'] = f"images/{new_filename}"
+            image_renames.append((old_filename, new_filename))
         
         # Update additional images if they exist
         if product.get('additional_images'):
@@ -38,12 +45,16 @@ def fix_product_ids():
                     file_ext = old_filename.split('.')[-1]
                     new_filename = f"{new_id}_({j+1}).{file_ext}"
                     new_additional_images.append(f"images/{new_filename}")
+                    image_renames.append((old_filename, new_filename))
                 else:
                     new_additional_images.append(img_path)
             product['additional_images'] = new_additional_images
         
         print(f"   {old_id} → {new_id}: {product['product_name']}")
     
+    # Rename stored images before saving the products
+    relink_store_images(image_renames)
+    
     # Save updated products
     with open('data/products_data.json', 'w', encoding='utf-8') as f:
         json.dump(products, f, indent=2, ensure_ascii=False)
@@ -53,6 +64,33 @@ def fix_product_ids():
     
     return products
 
+def relink_store_images(image_renames):
+    """Rename images in the content-addressed store (metadata only) and relink the images folder"""
+    store = ImageStore()
+    view = store.view_name("images")
+    if view not in store.views:
+        return False
+    
+    # Unchanged pairs stay in: an old name another product is renamed away from must survive
+    renames = []
+    for old, new in image_renames:
+        if old not in store.views[view]:
+            continue
+        try:
+            store.renamed(view, renames + [(old, new)])
+        except ValueError as e:
+            # e.g. an orphan image already stored under the new name
+            print(f"⚠️  Not renamed {old} → {new}: {e}")
+            continue
+        renames.append((old, new))
+    store.rename(view, renames)
+    counts = store.materialize(view)
+    renamed = sum(old != new for old, new in renames)
+    print(f"🔗 Renamed {renamed} images in the image store ({counts['linked']} relinked, no copies)")
+    for path in counts['refused']:
+        print(f"⚠️  Not linked {path}: a file the store did not put there is in the way")
+    return True
+
 def clean_images_folder():
     """Clean the images folder and prepare for fresh download"""
     print("\n🧹 Cleaning images folder...")
@@ -5,6 +5,10 @@ Script to identify missing primary product images and generate AI prompts
 
 import json
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from image_inventory import load_inventory
 
 def find_missing_images():
     # Load products data
@@ -12,13 +16,7 @@ def find_missing_images():
         products = json.load(f)
     
     # Get existing images
-    images_dir = 'MBL/images'
-    existing_images = set()
-    
-    if os.path.exists(images_dir):
-        for filename in os.listdir(images_dir):
-            if filename.startswith('MBL-') and filename.endswith('.jpg') and not '(' in filename:
-                existing_images.add(filename)
+    inventory = load_inventory('MBL/images')
     
     # Find missing primary images
     missing_images = []
@@ -27,7 +25,7 @@ def find_missing_images():
         product_id = product['product_id']
         expected_filename = f"{product_id}.jpg"
         
-        if expected_filename not in existing_images:
+        if inventory.primary_image(product_id) != expected_filename:
             missing_images.append({
                 'product_id': product_id,
                 'product_name': product['product_name'],
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Packed Image Atlas
+Packs every catalog thumbnail of one size into a single binary bundle so a
+catalog screen opens one file instead of dozens:
+
+    <magic><header length><JSON header><image bytes...>
+
+The JSON header maps each key (product_id, or product_id_(n) for additional
+images) to the [offset, length] of its encoded image. Readers mmap the
+bundle and hand out memoryview slices, so no image bytes are copied until
+the client decodes them; close() releases the slices still in use, which
+are unusable afterwards.
+
+With --sprites the bundle also carries one sprite sheet (a grid of
+size x size cells) and the cell rectangle of every key, for icon lists that
+draw from a single texture.
+
+Thumbnails come from the pyramid folders written by thumbnail_pyramid.py
+(images/<size>/); missing ones are rendered from the original image.
+
+Usage:
+    python image_atlas.py [size] [--sprites]
+"""
+
+import io
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+import weakref
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'imported_products'))
+from resize_engine import decode_for_size, to_rgb
+from thumbnail_pyramid import product_image_stems, pyramid_path
+
+ATLAS_MAGIC = b'MBLATLS\x01'
+SPRITE_SHEET_KEY = '__sprite_sheet__'
+DEFAULT_ATLAS_SIZE = 128
+JPEG_QUALITY = 90
+
+
+def atlas_path(images_folder, size):
+    return os.path.join(images_folder, f"atlas_{size}.bin")
+
+
+def render_thumbnail(source, size):
+    """Encoded JPEG thumbnail of source with its longest side at most size"""
+    with Image.open(source) as img:
+        thumbnail = to_rgb(decode_for_size(img, (size, size)), (255, 255, 255))
+        if max(thumbnail.size) > size:
+            thumbnail = thumbnail.copy()
+            thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def collect_thumbnails(products, size, images_folder="images"):
+    """
+    Returns:
+        dict: key -> encoded thumbnail bytes, in catalog order
+    """
+    thumbnails = {}
+    for product in products:
+        for source, stem in product_image_stems(product):
+            path = pyramid_path(images_folder, size, stem)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    thumbnails[stem] = f.read()
+            elif os.path.exists(source):
+                thumbnails[stem] = render_thumbnail(source, size)
+    return thumbnails
+
+
+def build_sprite_sheet(thumbnails, size):
+    """
+    Lay the thumbnails out on a square-ish grid of size x size cells.
+
+    Returns:
+        tuple: (encoded sprite sheet, key -> [x, y, width, height])
+    """
+    columns = max(1, math.ceil(math.sqrt(len(thumbnails))))
+    rows = max(1, math.ceil(len(thumbnails) / columns))
+    sheet = Image.new('RGB', (columns * size, rows * size), (255, 255, 255))
+    cells = {}
+    for position, (key, data) in enumerate(thumbnails.items()):
+        with Image.open(io.BytesIO(data)) as img:
+            x = (position % columns) * size + (size - img.width) // 2
+            y = (position // columns) * size + (size - img.height) // 2
+            sheet.paste(img, (x, y))
+            cells[key] = [x, y, img.width, img.height]
+    buffer = io.BytesIO()
+    sheet.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue(), cells
+
+
+def write_atlas(path, thumbnails, size, sprites=False):
+    """Write the bundle; returns its size in bytes"""
+    blobs = dict(thumbnails)
+    header = {'size': size, 'entries': {}}
+    if sprites:
+        blobs[SPRITE_SHEET_KEY], header['sprites'] = build_sprite_sheet(thumbnails, size)
+
+    offset = 0
+    for key, data in blobs.items():
+        header['entries'][key] = [offset, len(data)]
+        offset += len(data)
+
+    encoded_header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(ATLAS_MAGIC)
+        f.write(struct.pack('<I', len(encoded_header)))
+        f.write(encoded_header)
+        for data in blobs.values():
+            f.write(data)
+    os.replace(temp_path, path)
+    return os.path.getsize(path)
+
+
+class AtlasReader:
+    """mmap-backed reader; get() returns zero-copy memoryview slices"""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(ATLAS_MAGIC)] != ATLAS_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an image atlas")
+
+        pos = len(ATLAS_MAGIC)
+        (header_length,) = struct.unpack_from('<I', self._map, pos)
+        pos += 4
+        header = json.loads(self._map[pos:pos + header_length].decode('utf-8'))
+        self._data_start = pos + header_length
+        self._view = memoryview(self._map)
+        # Weak references to the slices get() handed out; the map cannot be closed
+        # while one is alive (not a WeakSet: equal slices would count as one)
+        self._slices = []
+
+        self.size = header['size']
+        self.entries = header['entries']
+        self.sprites = header.get('sprites', {})
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def keys(self):
+        return [key for key in self.entries if key != SPRITE_SHEET_KEY]
+
+    def get(self, key):
+        """Encoded image bytes of key as a memoryview into the mapped file (valid until close()), or None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        start = self._data_start + entry[0]
+        data = self._view[start:start + entry[1]]
+        self._slices.append(weakref.ref(data))
+        return data
+
+    def sprite_sheet(self):
+        return self.get(SPRITE_SHEET_KEY)
+
+    def sprite(self, key):
+        """(x, y, width, height) of key on the sprite sheet, or None"""
+        cell = self.sprites.get(key)
+        return tuple(cell) if cell else None
+
+    def close(self):
+        for reference in getattr(self, '_slices', ()):
+            data = reference()
+            if data is not None:
+                data.release()
+        self._slices = []
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    products_file = Path("data/products_data.json")
+    if not products_file.exists():
+        print(f"❌ Error: {products_file} not found!")
+        return
+
+    with open(products_file, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+
+    args = sys.argv[1:]
+    sprites = '--sprites' in args
+    sizes = [int(arg) for arg in args if arg.isdigit()]
+    size = sizes[0] if sizes else DEFAULT_ATLAS_SIZE
+
+    print(f"📦 PACKING {size}px IMAGE ATLAS")
+    print("=" * 50)
+    thumbnails = collect_thumbnails(products, size)
+    path = atlas_path("images", size)
+    bundle_bytes = write_atlas(path, thumbnails, size, sprites=sprites)
+    print(f"Images packed: {len(thumbnails)}{' + sprite sheet' if sprites else ''}")
+    print(f"Bundle: {path} ({bundle_bytes / 1024:.1f} KB)")
+
+    # One open + mmap against one open per thumbnail file
+    start = time.perf_counter()
+    with AtlasReader(path) as atlas:
+        atlas_bytes = sum(len(atlas.get(key)) for key in atlas.keys())
+    atlas_ms = (time.perf_counter() - start) * 1000
+    print(f"Read all thumbnails from the atlas: {atlas_ms:.2f} ms ({atlas_bytes / 1024:.1f} KB, 1 file)")
+
+    thumbnail_files = [pyramid_path("images", size, stem)
+                       for product in products for _, stem in product_image_stems(product)]
+    thumbnail_files = [file for file in thumbnail_files if os.path.exists(file)]
+    if thumbnail_files:
+        start = time.perf_counter()
+        file_bytes = 0
+        for file in thumbnail_files:
+            with open(file, 'rb') as f:
+                file_bytes += len(f.read())
+        files_ms = (time.perf_counter() - start) * 1000
+        print(f"Read the same thumbnails as files: {files_ms:.2f} ms ({file_bytes / 1024:.1f} KB, "
+              f"{len(thumbnail_files)} files)")
+
+
+if __name__ == "__main__":
+    main()
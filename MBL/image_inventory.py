@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Product Image Inventory
+One index of the images folder shared by the image reports: file name ->
+size, dimensions and SHA-1, and product_id -> primary/additional images.
+
+The index is cached in data/.image_inventory.json (next to
+products_data.json) - outside the images folder, since writing it there
+would change the very folder mtime it records. A refresh only rescans the
+folder when its mtime changed (a file was added, removed or renamed), and
+only files whose size or mtime changed are re-read. Files rewritten in
+place do not touch the folder mtime; use refresh(full=True) (--full) after
+editing images.
+
+Usage:
+    python image_inventory.py [--full]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+from PIL import Image
+
+# Extensions the image reports look for, in lookup priority order
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+INVENTORY_VERSION = 1
+
+# MBL-001.jpg (primary) or MBL-001_(2).jpg (additional image 2)
+_IMAGE_NAME_RE = re.compile(r'^(?P<product_id>.+?)(?:_\((?P<index>\d+)\))?(?P<ext>\.[A-Za-z]+)$')
+
+
+def parse_image_name(filename):
+    """
+    Returns:
+        tuple: (product_id, additional image index or None for the primary image),
+               or (None, None) for names that do not follow the convention
+    """
+    match = _IMAGE_NAME_RE.match(filename)
+    if not match or match.group('ext').lower() not in IMAGE_EXTENSIONS:
+        return None, None
+    index = match.group('index')
+    return match.group('product_id'), int(index) if index else None
+
+
+def default_cache_path(images_folder):
+    """data/.image_inventory.json beside the images folder (or the parent folder itself without data/)"""
+    parent = os.path.dirname(os.path.abspath(images_folder))
+    data_folder = os.path.join(parent, 'data')
+    return os.path.join(data_folder if os.path.isdir(data_folder) else parent, '.image_inventory.json')
+
+
+def _read_image_info(path, stat):
+    info = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'width': None, 'height': None}
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    info['sha1'] = digest.hexdigest()
+    try:
+        # Only the header is read here
+        with Image.open(path) as img:
+            info['width'], info['height'] = img.size
+    except Exception:
+        pass
+    return info
+
+
+class ImageInventory:
+    def __init__(self, images_folder="images", cache_path=None):
+        self.images_folder = images_folder
+        self.cache_path = cache_path or default_cache_path(images_folder)
+        self.folder_mtime_ns = None
+        # Work done by the last refresh(): files stat-ed and files re-read (hashed)
+        self.last_refresh = {'stat': 0, 'read': 0}
+        # File name -> size, mtime_ns, width, height, sha1
+        self.files = {}
+        # product_id -> {'primary': [names], 'additional': {index: [names]}}
+        self.products = {}
+        self._load_cache()
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INVENTORY_VERSION:
+            self.folder_mtime_ns = data.get('folder_mtime_ns')
+            self.files = data.get('files', {})
+            self._index_products()
+
+    def _save_cache(self):
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INVENTORY_VERSION,
+                'folder_mtime_ns': self.folder_mtime_ns,
+                'files': self.files,
+            }, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.cache_path)
+
+    def _index_products(self):
+        products = defaultdict(lambda: {'primary': [], 'additional': defaultdict(list)})
+        for name in sorted(self.files, key=self._name_priority):
+            product_id, index = parse_image_name(name)
+            if product_id is None:
+                continue
+            if index is None:
+                products[product_id]['primary'].append(name)
+            else:
+                products[product_id]['additional'][index].append(name)
+        self.products = dict(products)
+
+    @staticmethod
+    def _name_priority(name):
+        stem, ext = os.path.splitext(name)
+        return stem, IMAGE_EXTENSIONS.index(ext.lower()) if ext.lower() in IMAGE_EXTENSIONS else len(IMAGE_EXTENSIONS)
+
+    def refresh(self, full=False):
+        """
+        Bring the index up to date with the images folder.
+
+        Args:
+            full (bool): Stat every file even if the folder mtime is unchanged
+
+        Returns:
+            bool: True when the index changed
+        """
+        if not os.path.isdir(self.images_folder):
+            changed = bool(self.files)
+            self.files = {}
+            self.products = {}
+            return changed
+
+        self.last_refresh = {'stat': 0, 'read': 0}
+        folder_mtime_ns = os.stat(self.images_folder).st_mtime_ns
+        if not full and folder_mtime_ns == self.folder_mtime_ns:
+            return False
+
+        files = {}
+        changed = False
+        with os.scandir(self.images_folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in IMAGE_EXTENSIONS:
+                    continue
+                stat = entry.stat()
+                self.last_refresh['stat'] += 1
+                cached = self.files.get(entry.name)
+                if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+                    files[entry.name] = cached
+                else:
+                    files[entry.name] = _read_image_info(entry.path, stat)
+                    self.last_refresh['read'] += 1
+                    changed = True
+
+        changed = changed or files.keys() != self.files.keys()
+        self.files = files
+        self.folder_mtime_ns = folder_mtime_ns
+        self._index_products()
+        self._save_cache()
+        return changed
+
+    def has(self, filename):
+        return filename in self.files
+
+    def primary_image(self, product_id):
+        """File name of the product's primary image (.jpg preferred), or None"""
+        names = self.products.get(product_id, {}).get('primary')
+        return names[0] if names else None
+
+    def additional_images(self, product_id):
+        """File names of the product's additional images, by index"""
+        additional = self.products.get(product_id, {}).get('additional', {})
+        return [additional[index][0] for index in sorted(additional)]
+
+    def orphaned_images(self, product_ids):
+        """Files that are not the primary image of one of product_ids"""
+        primary = set()
+        for product_id in product_ids:
+            primary.update(self.products.get(product_id, {}).get('primary', ()))
+        return set(self.files) - primary
+
+
+def load_inventory(images_folder="images"):
+    """Inventory of images_folder, refreshed against the folder"""
+    inventory = ImageInventory(images_folder)
+    inventory.refresh()
+    return inventory
+
+
+def main():
+    inventory = ImageInventory()
+    changed = inventory.refresh(full='--full' in sys.argv[1:])
+
+    total_bytes = sum(info['size'] for info in inventory.files.values())
+    additional = sum(len(entry['additional']) for entry in inventory.products.values())
+    print("🗂️  IMAGE INVENTORY")
+    print("=" * 50)
+    print(f"Image files: {len(inventory.files)} ({total_bytes / 1e6:.1f} MB)")
+    print(f"Products with a primary image: {sum(bool(e['primary']) for e in inventory.products.values())}")
+    print(f"Additional images: {additional}")
+    print(f"Index {'updated' if changed else 'already up to date'}: {inventory.cache_path}")
+    print(f"Files stat-ed: {inventory.last_refresh['stat']}, re-read: {inventory.last_refresh['read']}")
+
+
+if __name__ == "__main__":
+    main()
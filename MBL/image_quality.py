@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Product Image Quality Analysis
+Scores every product photo for the problems we otherwise only spot by eye:
+blur, darkness, a background that is not white, and odd proportions.
+
+Each image is decoded at reduced size (longest side ANALYSIS_SIZE, JPEG
+draft mode) in a worker process and all metrics are NumPy array operations
+on that pixel array:
+  - sharpness: variance of the 4-neighbour Laplacian of the luma over the
+    non-white (product) pixels
+  - brightness: mean and 5th/50th/95th percentiles of the luma
+  - background: share of near-white pixels in the outer border band
+  - aspect ratio of the original image
+
+Images are ranked worst first into image_quality_report.json.
+
+Usage:
+    python image_quality.py [folder ...]
+"""
+
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'imported_products'))
+from image_hash_index import DEFAULT_FOLDERS, REPO_ROOT
+from resize_engine import CHUNKS_PER_WORKER, IMAGE_EXTENSIONS, find_images, to_rgb
+
+ANALYSIS_SIZE = 512
+
+# Share of the width/height treated as the border when judging the background
+BORDER_FRACTION = 0.06
+WHITE_LEVEL = 235
+# Below this share of non-white pixels sharpness is measured over the whole image
+MIN_FOREGROUND = 0.05
+
+# Thresholds for flagging an image
+MIN_SHARPNESS = 150.0
+MIN_MEAN_BRIGHTNESS = 110.0
+MIN_WHITE_BORDER = 0.6
+MAX_ASPECT_DEVIATION = 1.5
+MIN_SIDE = 400
+
+# Points taken off a score of 100 per flag
+FLAG_PENALTIES = {
+    'blurry': 35,
+    'dark': 25,
+    'non_white_background': 20,
+    'low_resolution': 15,
+    'odd_aspect_ratio': 10,
+}
+
+
+def _load_pixels(path):
+    """RGB array with the longest side at most ANALYSIS_SIZE, plus the original size"""
+    with Image.open(path) as img:
+        original_size = img.size
+        if img.format == 'JPEG':
+            img.draft('RGB', (ANALYSIS_SIZE, ANALYSIS_SIZE))
+        img = to_rgb(img, (255, 255, 255))
+        if max(img.size) > ANALYSIS_SIZE:
+            img = img.copy()
+            img.thumbnail((ANALYSIS_SIZE, ANALYSIS_SIZE), Image.Resampling.BILINEAR)
+        return np.asarray(img, dtype=np.float32), original_size
+
+
+def measure_image(path):
+    """
+    Returns:
+        dict: path, metrics, flags and score (or error)
+    """
+    try:
+        rgb, (width, height) = _load_pixels(path)
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+    white = (rgb >= WHITE_LEVEL).all(axis=2)
+
+    # Sharpness of the product only: flat white background would dilute the variance
+    laplacian = (luma[1:-1, :-2] + luma[1:-1, 2:] + luma[:-2, 1:-1] + luma[2:, 1:-1]
+                 - 4 * luma[1:-1, 1:-1])
+    foreground = ~white[1:-1, 1:-1]
+    if foreground.sum() >= MIN_FOREGROUND * foreground.size:
+        laplacian = laplacian[foreground]
+    sharpness = float(laplacian.var()) if laplacian.size else 0.0
+
+    p5, p50, p95 = np.percentile(luma, [5, 50, 95])
+
+    rows, columns = luma.shape
+    band_rows = max(1, int(rows * BORDER_FRACTION))
+    band_columns = max(1, int(columns * BORDER_FRACTION))
+    border = np.ones(luma.shape, dtype=bool)
+    border[band_rows:rows - band_rows, band_columns:columns - band_columns] = False
+    white_border = float(white[border].mean())
+
+    aspect_ratio = width / height if height else 0.0
+    metrics = {
+        'width': width,
+        'height': height,
+        'aspect_ratio': round(aspect_ratio, 3),
+        'sharpness': round(sharpness, 1),
+        'mean_brightness': round(float(luma.mean()), 1),
+        'brightness_p5': round(float(p5), 1),
+        'brightness_p50': round(float(p50), 1),
+        'brightness_p95': round(float(p95), 1),
+        'white_border_ratio': round(white_border, 3),
+        'white_pixel_ratio': round(float(white.mean()), 3),
+    }
+
+    flags = []
+    if sharpness < MIN_SHARPNESS:
+        flags.append('blurry')
+    if metrics['mean_brightness'] < MIN_MEAN_BRIGHTNESS:
+        flags.append('dark')
+    if white_border < MIN_WHITE_BORDER:
+        flags.append('non_white_background')
+    if max(width, height) < MIN_SIDE:
+        flags.append('low_resolution')
+    if aspect_ratio and max(aspect_ratio, 1 / aspect_ratio) > MAX_ASPECT_DEVIATION:
+        flags.append('odd_aspect_ratio')
+
+    return {
+        'path': path,
+        'score': max(0, 100 - sum(FLAG_PENALTIES[flag] for flag in flags)),
+        'flags': flags,
+        'metrics': metrics,
+    }
+
+
+def analyze_image_quality(paths, workers=None):
+    """Measure paths in parallel; returns results ranked worst first"""
+    workers = max(1, min(workers or cpu_count(), len(paths) or 1))
+    chunksize = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+    with Pool(workers) as pool:
+        results = list(pool.imap(measure_image, paths, chunksize=chunksize))
+    measured = [r for r in results if 'error' not in r]
+    measured.sort(key=lambda r: (r['score'], r['metrics']['sharpness'], r['path']))
+    return measured, [r for r in results if 'error' in r]
+
+
+def main():
+    folders = sys.argv[1:] or [os.path.join(REPO_ROOT, folder) for folder in DEFAULT_FOLDERS]
+    paths = []
+    for folder in folders:
+        if os.path.isdir(folder):
+            # Generated size folders (images/256 ...) are copies of the originals
+            paths.extend(path for path in find_images(folder, IMAGE_EXTENSIONS + ('.gif', '.webp'))
+                         if not os.path.basename(os.path.dirname(path)).isdigit())
+
+    print("🔬 PRODUCT IMAGE QUALITY ANALYSIS")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    ranked, errors = analyze_image_quality(paths)
+    elapsed = time.perf_counter() - start
+
+    flag_counts = {flag: sum(flag in r['flags'] for r in ranked) for flag in FLAG_PENALTIES}
+    print(f"📊 Images analyzed: {len(ranked)} in {elapsed:.1f}s ({len(errors)} unreadable)")
+    for flag, count in flag_counts.items():
+        print(f"   {flag.replace('_', ' ')}: {count}")
+
+    print(f"\n⚠️  LOWEST SCORING IMAGES:")
+    print("-" * 50)
+    for result in ranked[:15]:
+        metrics = result['metrics']
+        print(f"{result['score']:3d}  {os.path.relpath(result['path'], REPO_ROOT)}")
+        print(f"     {', '.join(result['flags']) or 'no flags'} | sharpness {metrics['sharpness']}, "
+              f"brightness {metrics['mean_brightness']}, white border {metrics['white_border_ratio']:.0%}")
+
+    report = {
+        'summary': {
+            'images_analyzed': len(ranked),
+            'unreadable_images': len(errors),
+            'flag_counts': flag_counts,
+            'thresholds': {
+                'min_sharpness': MIN_SHARPNESS,
+                'min_mean_brightness': MIN_MEAN_BRIGHTNESS,
+                'min_white_border': MIN_WHITE_BORDER,
+                'max_aspect_deviation': MAX_ASPECT_DEVIATION,
+                'min_side': MIN_SIDE,
+            },
+        },
+        'images': [dict(r, path=os.path.relpath(r['path'], REPO_ROOT)) for r in ranked],
+        'unreadable': [dict(r, path=os.path.relpath(r['path'], REPO_ROOT)) for r in errors],
+    }
+    with open('image_quality_report.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report saved to: image_quality_report.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Image Store
+Keeps every product image once, filed by SHA-1, and materializes the named
+folder layouts (views) as hardlinks or symlinks from a mapping table:
+
+    .image_store/objects/3f/3fa4...e1          (the bytes, stored once)
+    .image_store/views.json                    {"MBL/images": {"MBL-001.jpg": "3fa4...e1", ...}}
+    MBL/images/MBL-001.jpg  -> hardlink to the object
+
+Renaming or re-laying out a view only edits views.json; materialize() then
+relinks the folder without copying image data. Identical files in several
+folders share one object, and one object can appear under several names.
+
+materialized.json remembers which object materialize() last linked under
+each name of a view. A file is only ever replaced or removed while it still
+holds those bytes: files added to the folder by hand are never touched, and a
+linked file that was replaced by a new image is imported into the store and
+mapped under its name instead of being overwritten. A file in the way of a
+name it did not link is reported and left alone.
+
+Linked files share their bytes with the store, so tools must replace them
+(write a new file) rather than edit them in place; verify() re-hashes the
+objects to catch that.
+
+Usage (paths relative to the repository root):
+    python image_store.py import MBL/images
+    python image_store.py materialize [view]
+    python image_store.py status | verify | gc
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_ROOT = os.path.join(REPO_ROOT, '.image_store')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tif', '.tiff')
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageStore:
+    def __init__(self, root=STORE_ROOT, link_mode='hardlink'):
+        """
+        Args:
+            root (str): Store directory
+            link_mode (str): 'hardlink', 'symlink' or 'copy' for materialized views
+        """
+        self.root = root
+        self.link_mode = link_mode
+        self.objects_dir = os.path.join(root, 'objects')
+        self.views_path = os.path.join(root, 'views.json')
+        self.materialized_path = os.path.join(root, 'materialized.json')
+        # View (folder relative to the repo root) -> file name -> object id (SHA-1)
+        self.views = self._read_json(self.views_path)
+        # View -> file name -> object id the last materialize() linked there
+        self.materialized = {
+            view: dict.fromkeys(linked) if isinstance(linked, list) else linked
+            for view, linked in self._read_json(self.materialized_path).items()
+        }
+
+    @staticmethod
+    def _read_json(path):
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_json(self, path, data):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(temp_path, path)
+
+    def save(self):
+        self._write_json(self.views_path, self.views)
+
+    @staticmethod
+    def view_name(folder):
+        """View name of a folder: its path relative to the repo root"""
+        return os.path.relpath(os.path.abspath(folder), REPO_ROOT).replace(os.sep, '/')
+
+    def object_path(self, object_id):
+        return os.path.join(self.objects_dir, object_id[:2], object_id)
+
+    def add_file(self, path):
+        """
+        File a copy of path in the store.
+
+        Returns:
+            str: Object id (SHA-1 of the content)
+        """
+        object_id = file_sha1(path)
+        object_path = self.object_path(object_id)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temp_path = object_path + '.tmp'
+            shutil.copyfile(path, temp_path)
+            os.replace(temp_path, object_path)
+        return object_id
+
+    def import_folder(self, folder):
+        """
+        Take over a folder: file its images in the store and relink them.
+
+        Returns:
+            tuple: (view name, number of images, number of new objects)
+        """
+        view = self.view_name(folder)
+        files = self.views.setdefault(view, {})
+        known_objects = self._all_objects()
+        new_objects = 0
+        for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+            if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            object_id = self.add_file(entry.path)
+            if object_id not in known_objects:
+                known_objects.add(object_id)
+                new_objects += 1
+            files[entry.name] = object_id
+        self.save()
+        self.materialize(view)
+        return view, len(files), new_objects
+
+    def rename(self, view, renames):
+        """
+        Rename files of a view in the mapping table only (call materialize() to relink).
+
+        Args:
+            view (str): View name
+            renames: Old file name -> new file name, as a dict or as (old, new) pairs; an old
+                     name given several new names appears under each of them (one object, no
+                     copies). Applied all at once, so swaps work.
+
+        Raises:
+            ValueError: Two different images would end up under one name
+        """
+        self.views[view] = self.renamed(view, renames)
+        self.save()
+
+    def renamed(self, view, renames):
+        """
+        The file mapping of view after rename(view, renames), without changing it.
+
+        Raises:
+            ValueError: Two different images would end up under one name
+        """
+        targets = {}
+        for old, new in (renames.items() if isinstance(renames, dict) else renames):
+            targets.setdefault(old, []).append(new)
+
+        files = self.views[view]
+        renamed = {}
+        for name, object_id in files.items():
+            for target in targets.get(name, [name]):
+                if renamed.get(target, object_id) != object_id:
+                    raise ValueError(f"Rename would map two images to {view}/{target}")
+                renamed[target] = object_id
+        return renamed
+
+    def _link(self, object_path, path):
+        temp_path = path + '.tmp-link'
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        if self.link_mode == 'hardlink':
+            os.link(object_path, temp_path)
+        elif self.link_mode == 'symlink':
+            os.symlink(os.path.relpath(object_path, os.path.dirname(path)), temp_path)
+        else:
+            shutil.copyfile(object_path, temp_path)
+        os.replace(temp_path, path)
+
+    def _is_linked(self, object_path, path):
+        if not os.path.lexists(path):
+            return False
+        if self.link_mode == 'symlink':
+            return os.path.islink(path) and os.path.samefile(path, object_path)
+        if self.link_mode == 'hardlink':
+            return not os.path.islink(path) and os.path.samefile(path, object_path)
+        return file_sha1(path) == os.path.basename(object_path)
+
+    def materialize(self, view=None):
+        """
+        Make view folders match the mapping table: link mapped names, and remove
+        names the previous materialize() linked that are no longer mapped.
+
+        Only files still holding the bytes materialize() linked there are
+        replaced or removed. A linked file replaced by new bytes is imported
+        and mapped under its name; any other file in the way is left alone and
+        reported as refused.
+
+        Returns:
+            dict: Counts of linked, unchanged, removed and reimported files, and the
+                  refused paths (relative to the repo root)
+        """
+        counts = {'linked': 0, 'unchanged': 0, 'removed': 0, 'reimported': 0, 'refused': []}
+        all_objects = self._all_objects()
+        for view_name in ([view] if view else sorted(self.views)):
+            folder = os.path.join(REPO_ROOT, view_name)
+            os.makedirs(folder, exist_ok=True)
+            files = self.views[view_name]
+            previous = self.materialized.get(view_name, {})
+            linked = {}
+
+            for name in sorted(set(previous) - set(files)):
+                path = os.path.join(folder, name)
+                # Not if it was replaced by a file of its own since
+                if os.path.lexists(path) and self._holds(path, previous[name], all_objects):
+                    os.remove(path)
+                    counts['removed'] += 1
+
+            for name, object_id in files.items():
+                object_path = self.object_path(object_id)
+                path = os.path.join(folder, name)
+                if self._is_linked(object_path, path):
+                    counts['unchanged'] += 1
+                elif not os.path.exists(path) or self._holds(path, previous.get(name), all_objects, object_id):
+                    self._link(object_path, path)
+                    counts['linked'] += 1
+                elif name in previous and previous[name] in (None, object_id):
+                    # A linked image replaced by a new file: keep the new bytes
+                    files[name] = object_id = self.add_file(path)
+                    all_objects.add(object_id)
+                    self._link(self.object_path(object_id), path)
+                    counts['reimported'] += 1
+                else:
+                    counts['refused'].append(f"{view_name}/{name}")
+                    continue
+                linked[name] = object_id
+            self.materialized[view_name] = linked
+        if counts['reimported']:
+            self.save()
+        self._write_json(self.materialized_path, self.materialized)
+        return counts
+
+    def _holds(self, path, object_id, all_objects, mapped_id=None):
+        """
+        Whether the file at path may be replaced: it holds object_id (what was last
+        linked there), mapped_id, or, with object_id unknown, any stored object.
+        """
+        if not os.path.isfile(path):
+            return False
+        content_id = file_sha1(path)
+        if object_id is None:
+            return content_id in all_objects
+        return content_id in (object_id, mapped_id)
+
+    def _all_objects(self):
+        objects = set()
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.scandir(self.objects_dir):
+                if prefix.is_dir():
+                    objects.update(entry.name for entry in os.scandir(prefix.path) if not entry.name.endswith('.tmp'))
+        return objects
+
+    def gc(self):
+        """Delete objects no view refers to; returns the number of bytes freed"""
+        referenced = {object_id for files in self.views.values() for object_id in files.values()}
+        freed = 0
+        for object_id in self._all_objects() - referenced:
+            path = self.object_path(object_id)
+            freed += os.path.getsize(path)
+            os.remove(path)
+        return freed
+
+    def verify(self):
+        """Object ids whose bytes no longer match their hash (edited through a link)"""
+        return sorted(
+            object_id for object_id in self._all_objects()
+            if file_sha1(self.object_path(object_id)) != object_id
+        )
+
+    def status(self):
+        objects = self._all_objects()
+        stored_bytes = sum(os.path.getsize(self.object_path(object_id)) for object_id in objects)
+        logical_bytes = sum(
+            os.path.getsize(self.object_path(object_id))
+            for files in self.views.values() for object_id in files.values()
+            if object_id in objects
+        )
+        return {
+            'views': {view: len(files) for view, files in sorted(self.views.items())},
+            'objects': len(objects),
+            'stored_bytes': stored_bytes,
+            'logical_bytes': logical_bytes,
+        }
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    store = ImageStore()
+
+    if command == 'import':
+        for folder in sys.argv[2:]:
+            view, images, new_objects = store.import_folder(os.path.join(REPO_ROOT, folder))
+            print(f"📥 {view}: {images} images, {new_objects} new objects")
+    elif command == 'materialize':
+        counts = store.materialize(sys.argv[2] if len(sys.argv) > 2 else None)
+        print(f"🔗 Linked: {counts['linked']}, unchanged: {counts['unchanged']}, removed: {counts['removed']}, "
+              f"reimported: {counts['reimported']}")
+        for path in counts['refused']:
+            print(f"⚠️  {path}: not linked, a file the store did not put there is in the way")
+    elif command == 'verify':
+        damaged = store.verify()
+        print(f"{'❌' if damaged else '✅'} Damaged objects: {len(damaged)}")
+        for object_id in damaged:
+            print(f"   {object_id}")
+    elif command == 'gc':
+        print(f"🗑️  Freed {store.gc() / 1e6:.1f} MB")
+    elif command != 'status':
+        print(__doc__)
+        return
+
+    status = store.status()
+    print("\n📦 IMAGE STORE")
+    print("=" * 50)
+    for view, count in status['views'].items():
+        print(f"{view}: {count} images")
+    print(f"Objects: {status['objects']}")
+    print(f"Stored: {status['stored_bytes'] / 1e6:.1f} MB for {status['logical_bytes'] / 1e6:.1f} MB of view files")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ Updated to handle proper HTML structure
 import json
 import re
 import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
@@ -15,6 +16,13 @@ import time
 from datetime import datetime
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from facet_engine import FacetIndex, field_facet, presence_facet
+
+# Fields counted in the enhancement summary
+ENHANCED_FIELDS = ('description', 'dosage', 'crops_pests', 'product_image', 'additional_images')
+
 class EnhancedProductExtractor:
     def __init__(self, json_file_path="data/products_data.json", base_url="https://www.mcdonaldbd.com"):
         self.json_file_path = json_file_path
@@ -339,24 +347,18 @@ class EnhancedProductExtractor:
         print("="*60)
         
         # Count by category
-        categories = {}
-        for product in self.products:
-            category = product['category_name']
-            categories[category] = categories.get(category, 0) + 1
+        facets = FacetIndex(facets={
+            'category_name': field_facet('category_name'),
+            **{field: presence_facet(field) for field in ENHANCED_FIELDS},
+        }).build(self.products)
         
         print(f"Total Products: {len(self.products)}")
         print("\n📋 Products by Category:")
-        for category, count in sorted(categories.items()):
+        for category, count in sorted(facets.facet_counts('category_name').items()):
             print(f"  {category}: {count} products")
         
         # Count enhanced fields
-        enhanced_fields = {
-            'description': sum(1 for p in self.products if p.get('description')),
-            'dosage': sum(1 for p in self.products if p.get('dosage')),
-            'crops_pests': sum(1 for p in self.products if p.get('crops_pests')),
-            'product_image': sum(1 for p in self.products if p.get('product_image')),
-            'additional_images': sum(1 for p in self.products if p.get('additional_images'))
-        }
+        enhanced_fields = {field: facets.count(**{field: True}) for field in ENHANCED_FIELDS}
         
         print(f"\n🔍 Enhanced Fields:")
         for field, count in enhanced_fields.items():
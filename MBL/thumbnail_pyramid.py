@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Thumbnail Pyramid Generator
+Decodes every product image once and writes a set of sizes for list icons,
+cards and detail views by successive downsampling of the previous level.
+
+Outputs sit next to the existing layout, one folder per size, named after
+the product_id from products_data.json:
+
+    images/MBL-001.jpg            (original)
+    images/256/MBL-001.jpg        (longest side 256)
+    images/256/MBL-001_(1).jpg    (additional image 1)
+
+Aspect ratio is kept and sources are never upscaled. Unchanged sources are
+skipped on re-runs through the build manifest in images/.pyramid_manifest.json.
+
+Usage:
+    python thumbnail_pyramid.py [size ...]
+"""
+
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from multiprocessing import Pool, cpu_count
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'imported_products'))
+from build_manifest import BuildManifest
+from resize_engine import CHUNKS_PER_WORKER, to_rgb, decode_for_size
+
+from PIL import Image
+
+PYRAMID_SIZES = (1024, 512, 256, 128, 64)
+JPEG_QUALITY = 90
+
+
+def pyramid_path(images_folder, size, stem):
+    return os.path.join(images_folder, str(size), f"{stem}.jpg")
+
+
+def product_image_stems(product):
+    """
+    Source image and deterministic output stem for each image of a product.
+
+    Returns:
+        list: (image path relative to the MBL folder, output stem) tuples
+    """
+    product_id = product.get('product_id')
+    images = []
+    if product.get('product_image'):
+        images.append((product['product_image'], product_id))
+    for index, image in enumerate(product.get('additional_images') or [], 1):
+        images.append((image, f"{product_id}_({index})"))
+    return images
+
+
+def build_pyramid(task):
+    """
+    Decode one source and write every requested level.
+
+    Args:
+        task (tuple): (source path, [(size, output path), ...]) with sizes in descending order
+
+    Returns:
+        tuple: (source path, number of files written, error or None)
+    """
+    source, levels = task
+    try:
+        largest = levels[0][0]
+        with Image.open(source) as img:
+            level = to_rgb(decode_for_size(img, (largest, largest)), (255, 255, 255))
+            for size, output_path in levels:
+                if max(level.size) > size:
+                    # Each level is downsampled from the previous, larger one
+                    level = level.copy()
+                    level.thumbnail((size, size), Image.Resampling.LANCZOS)
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                level.save(output_path, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+        return source, len(levels), None
+    except Exception as e:
+        return source, 0, str(e) or repr(e)
+
+
+def generate_pyramids(products, images_folder="images", sizes=PYRAMID_SIZES, workers=None):
+    """
+    Write the pyramid of every product image.
+
+    Returns:
+        dict: Counts of sources, written/skipped files and failures
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    jobs = []
+    size_of = {}
+    for product in products:
+        for image, stem in product_image_stems(product):
+            if os.path.exists(image):
+                for size in sizes:
+                    output_path = pyramid_path(images_folder, size, stem)
+                    jobs.append((image, output_path))
+                    size_of[output_path] = size
+
+    manifest = BuildManifest(os.path.join(images_folder, '.pyramid_manifest.json'),
+                             {'sizes': sizes, 'quality': JPEG_QUALITY})
+    removed = manifest.prune()
+    todo, skipped = manifest.plan(jobs)
+
+    # One task per source so it is decoded once for all of its levels
+    levels_by_source = defaultdict(list)
+    for source, output_path in todo:
+        levels_by_source[source].append((size_of[output_path], output_path))
+    tasks = [(source, sorted(levels, reverse=True)) for source, levels in levels_by_source.items()]
+
+    stats = {'sources': len(tasks), 'written': 0, 'skipped': skipped, 'removed': len(removed), 'failed': []}
+    if tasks:
+        workers = max(1, min(workers or cpu_count(), len(tasks)))
+        chunksize = max(1, len(tasks) // (workers * CHUNKS_PER_WORKER))
+        with Pool(workers) as pool:
+            for source, written, error in pool.imap_unordered(build_pyramid, tasks, chunksize=chunksize):
+                if error is not None:
+                    stats['failed'].append((source, error))
+                    print(f"❌ {source}: {error}")
+                    continue
+                stats['written'] += written
+                for _, output_path in levels_by_source[source]:
+                    manifest.record(source, output_path)
+    manifest.save()
+    return stats
+
+
+def main():
+    products_file = Path("data/products_data.json")
+    if not products_file.exists():
+        print(f"❌ Error: {products_file} not found!")
+        return
+
+    with open(products_file, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+
+    sizes = [int(size) for size in sys.argv[1:]] or PYRAMID_SIZES
+
+    print(f"🖼️  Building {'/'.join(map(str, sorted(sizes)))} pyramids for {len(products)} products")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    stats = generate_pyramids(products, sizes=sizes)
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 Sources decoded: {stats['sources']}")
+    print(f"✅ Files written: {stats['written']}")
+    print(f"⏭️  Unchanged (skipped): {stats['skipped']}")
+    print(f"🗑️  Removed files of deleted sources: {stats['removed']}")
+    print(f"❌ Failed: {len(stats['failed'])}")
+    print(f"⏱️  {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
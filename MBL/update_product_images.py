@@ -9,6 +9,8 @@ import json
 import os
 from pathlib import Path
 
+from image_inventory import load_inventory
+
 def update_product_images():
     """Update product images to use local files instead of placeholders."""
     
@@ -30,10 +32,8 @@ def update_product_images():
         print(f"❌ Error: {images_folder} folder not found!")
         return
     
-    # Get list of all image files in the images folder
-    image_files = set()
-    for ext in ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp']:
-        image_files.update([f.name for f in images_folder.glob(ext)])
+    # Image inventory, rescanned only when the images folder changed
+    inventory = load_inventory(images_folder)
     
     updated_count = 0
     not_found_count = 0
@@ -46,19 +46,7 @@ def update_product_images():
         # Check if it's a placeholder image
         if 'product-image.jpg' in product_image or 'product-image.png' in product_image:
             # Look for corresponding local image
-            possible_names = [
-                f"{product_id}.jpg",
-                f"{product_id}.jpeg", 
-                f"{product_id}.png",
-                f"{product_id}.gif",
-                f"{product_id}.bmp"
-            ]
-            
-            found_image = None
-            for name in possible_names:
-                if name in image_files:
-                    found_image = name
-                    break
+            found_image = inventory.primary_image(product_id)
             
             if found_image:
                 # Update the product image path
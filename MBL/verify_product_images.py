@@ -9,6 +9,8 @@ import json
 import os
 from pathlib import Path
 
+from image_inventory import load_inventory
+
 def verify_product_images():
     """Verify that all products have their corresponding images."""
     
@@ -30,10 +32,9 @@ def verify_product_images():
         print(f"❌ Error: {images_folder} folder not found!")
         return
     
-    # Get list of all image files in the images folder
-    image_files = set()
-    for ext in ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp']:
-        image_files.update([f.name for f in images_folder.glob(ext)])
+    # Image inventory, rescanned only when the images folder changed
+    inventory = load_inventory(images_folder)
+    image_files = set(inventory.files)
     
     print(f"📁 Total image files in images folder: {len(image_files)}")
     print("=" * 60)
@@ -109,16 +110,8 @@ def verify_product_images():
     print(f"With placeholder images: {len(placeholder_images)} ({len(placeholder_images)/len(products)*100:.1f}%)")
     print(f"Missing images: {len(missing_images)} ({len(missing_images)/len(products)*100:.1f}%)")
     
-    # Check for orphaned images (images without corresponding products)
-    expected_image_names = set()
-    for product in products:
-        product_id = product.get('product_id', '')
-        if product_id:
-            # Check for various possible image extensions
-            for ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-                expected_image_names.add(f"{product_id}{ext}")
-    
-    orphaned_images = image_files - expected_image_names
+    # Check for orphaned images (images that are not a product's primary image)
+    orphaned_images = inventory.orphaned_images(product.get('product_id', '') for product in products)
     if orphaned_images:
         print(f"\n🔍 ORPHANED IMAGES (images without corresponding products): {len(orphaned_images)}")
         print("-" * 40)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Automatic Whitespace Trimming
+Many product photos are a small bottle in a large white field; resizing the
+whole frame to 512x512 spends most of the output on background. This stage
+finds the product's bounding box and crops to it (plus a margin) before the
+final resample.
+
+The background colour is the median of the image border. A pixel is product
+when any channel differs from it by more than TRIM_THRESHOLD, or when it
+sits on a brightness edge (white caps on an off-white backdrop); rows and
+columns with only a few such pixels (JPEG noise, dust) are ignored. The
+search runs on a copy reduced to about DETECTION_SIZE pixels, so it costs
+little next to the resize itself. The box is grown by the margin and then to
+the target aspect ratio, so trimming never changes the product's proportions
+in the output.
+
+Used by resize_engine.py; resize_images.py and process_images.py enable it with
+    --trim [--trim-margin 0.08]
+"""
+
+import numpy as np
+
+# Largest per-channel difference from the background still counted as background
+TRIM_THRESHOLD = 24
+
+# Margin around the product as a share of the box's longer side
+TRIM_MARGIN = 0.08
+
+# Brightness step between neighbouring pixels that counts as an edge of the
+# product; catches white caps and labels on an off-white backdrop
+EDGE_THRESHOLD = 6
+
+# Rows/columns with fewer product pixels than this share of their length are noise
+MIN_LINE_FRACTION = 0.005
+
+# Border width (share of each side) sampled for the background colour
+BORDER_FRACTION = 0.02
+
+# The product is located on a copy reduced to about this size; the margin absorbs the rounding
+DETECTION_SIZE = 256
+
+
+def background_color(pixels):
+    """Median colour of the outer border of an (height, width, 3) array"""
+    height, width = pixels.shape[:2]
+    band = max(1, int(min(height, width) * BORDER_FRACTION))
+    border = np.concatenate([
+        pixels[:band].reshape(-1, 3), pixels[-band:].reshape(-1, 3),
+        pixels[:, :band].reshape(-1, 3), pixels[:, -band:].reshape(-1, 3),
+    ])
+    return np.median(border, axis=0)
+
+
+def content_box(img, threshold=TRIM_THRESHOLD):
+    """
+    Bounding box of the product in an RGB image.
+
+    Returns:
+        tuple: (left, top, right, bottom), or None when the image is all background
+    """
+    factor = max(1, max(img.size) // DETECTION_SIZE)
+    pixels = np.asarray(img.reduce(factor) if factor > 1 else img, dtype=np.int16)
+    difference = np.abs(pixels - background_color(pixels).astype(np.int16)).max(axis=2)
+    luma = pixels.mean(axis=2)
+    content = difference > threshold
+    content[1:] |= np.abs(np.diff(luma, axis=0)) > EDGE_THRESHOLD
+    content[:, 1:] |= np.abs(np.diff(luma, axis=1)) > EDGE_THRESHOLD
+
+    height, width = content.shape
+    rows = np.flatnonzero(content.sum(axis=1) > max(1, width * MIN_LINE_FRACTION))
+    columns = np.flatnonzero(content.sum(axis=0) > max(1, height * MIN_LINE_FRACTION))
+    if not rows.size or not columns.size:
+        return None
+    return (int(columns[0]) * factor, int(rows[0]) * factor,
+            min(img.width, (int(columns[-1]) + 1) * factor), min(img.height, (int(rows[-1]) + 1) * factor))
+
+
+def _expand(start, end, length, limit):
+    """Grow [start, end) to length around its centre, shifted to stay within [0, limit)"""
+    length = min(length, limit)
+    start = max(0, min((start + end - length) // 2, limit - length))
+    return start, start + length
+
+
+def trim_box(img, size, threshold=TRIM_THRESHOLD, margin=TRIM_MARGIN):
+    """
+    Crop box around the product with margin, at the aspect ratio of size.
+
+    Args:
+        img (PIL.Image.Image): RGB image
+        size (tuple): Final (width, height) the crop will be resized to
+
+    Returns:
+        tuple: (left, top, right, bottom), or None when there is nothing to trim
+    """
+    box = content_box(img, threshold)
+    if box is None:
+        return None
+    left, top, right, bottom = box
+    pad = int(max(right - left, bottom - top) * margin)
+    width, height = right - left + 2 * pad, bottom - top + 2 * pad
+
+    # Widen or heighten to the output aspect ratio so the resize does not distort the product
+    aspect = size[0] / size[1]
+    if width / height < aspect:
+        width = round(height * aspect)
+    else:
+        height = round(width / aspect)
+
+    left, right = _expand(left, right, width, img.width)
+    top, bottom = _expand(top, bottom, height, img.height)
+    if (left, top, right, bottom) == (0, 0, img.width, img.height):
+        return None
+    return left, top, right, bottom
+
+
+def trim(img, size, threshold=TRIM_THRESHOLD, margin=TRIM_MARGIN):
+    """img cropped to trim_box(), or img itself when there is nothing to trim"""
+    box = trim_box(img, size, threshold, margin)
+    return img.crop(box) if box else img
+
+
+def parse_trim_args(argv):
+    """
+    Trim options from command-line flags.
+
+    Returns:
+        dict: threshold and margin for resize_engine.resize_images(trim=...), or None without --trim
+    """
+    if '--trim' not in argv:
+        return None
+    options = {'threshold': TRIM_THRESHOLD, 'margin': TRIM_MARGIN}
+    if '--trim-margin' in argv and argv.index('--trim-margin') + 1 < len(argv):
+        options['margin'] = float(argv[argv.index('--trim-margin') + 1])
+    return options
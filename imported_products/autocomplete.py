@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Product Name Autocomplete
+Sorted-array prefix index over product_name, medicine_name and reg_no for
+both English and Bengali names. Built once from the catalog; lookups are two
+binary searches plus a top-k over the matching range. Completions for very
+short prefixes (which match large ranges) are precomputed at build time.
+
+Usage:
+    python autocomplete.py Sun
+"""
+
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+
+from text_normalization import normalize_text
+
+AUTOCOMPLETE_FIELDS = ('product_name', 'medicine_name', 'reg_no')
+
+# Prefixes up to this many characters have their top-k answers precomputed
+PRECOMPUTED_PREFIX_LENGTH = 2
+DEFAULT_TOP_K = 10
+
+
+def _rank_value(product, rank_field, popularity):
+    if popularity is not None:
+        return popularity.get(product.get('product_id'), 0)
+    try:
+        return int(str(product.get(rank_field, 0)).replace(',', ''))
+    except ValueError:
+        return 0
+
+
+class PrefixIndex:
+    def __init__(self, top_k=DEFAULT_TOP_K):
+        self.top_k = top_k
+        self.keys = []
+        # Parallel to keys: (rank, product_id, field, display value)
+        self.entries = []
+        self.short_prefixes = {}
+
+    def build(self, products, fields=AUTOCOMPLETE_FIELDS, rank_field='Stocks', popularity=None):
+        """
+        Build the index from product dicts.
+
+        Args:
+            products (list): Catalog product dicts
+            fields (tuple): Fields whose values can be completed
+            rank_field (str): Numeric field used to rank completions (e.g. Stocks)
+            popularity (dict): Optional product_id -> score that overrides rank_field
+        """
+        pairs = []
+        for product in products:
+            rank = _rank_value(product, rank_field, popularity)
+            product_id = product.get('product_id', '')
+            for field in fields:
+                value = product.get(field)
+                if not value:
+                    continue
+                display = ' '.join(str(value).split())
+                words = normalize_text(display).split()
+                # Index every word start so "Super" completes "Gain Super 70 WG"
+                for i in range(len(words)):
+                    pairs.append((' '.join(words[i:]), (rank, product_id, field, display)))
+
+        pairs.sort(key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.entries = [entry for _, entry in pairs]
+
+        self.short_prefixes = {}
+        prefixes = {key[:n] for key in self.keys for n in range(1, PRECOMPUTED_PREFIX_LENGTH + 1)}
+        for prefix in prefixes:
+            self.short_prefixes[prefix] = self._scan(prefix, self.top_k)
+        return self
+
+    def _scan(self, prefix, top_k):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\U0010ffff', lo)
+
+        # One completion per distinct value, credited to its best-ranked product
+        best = {}
+        for rank, product_id, field, display in self.entries[lo:hi]:
+            key = (field, display.lower())
+            if key not in best or best[key][0] < rank:
+                best[key] = (rank, product_id, field, display)
+        ranked = sorted(best.values(), key=lambda e: (-e[0], e[3]))[:top_k]
+        return [(display, field, product_id, rank) for rank, product_id, field, display in ranked]
+
+    def complete(self, prefix, top_k=None):
+        """
+        Return up to top_k completions for a partial name.
+
+        Returns:
+            list: (display value, field, product_id, rank) tuples, best first
+        """
+        top_k = top_k or self.top_k
+        query = normalize_text(prefix)
+        if not query:
+            return []
+        if len(query) <= PRECOMPUTED_PREFIX_LENGTH and top_k <= self.top_k:
+            return self.short_prefixes.get(query, [])[:top_k]
+        return self._scan(query, top_k)
+
+
+def load_products(paths):
+    products = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                products.extend(json.load(f))
+    return products
+
+
+def main():
+    products = load_products(['products_data.json', 'kb_english_products.json', 'kb_bengali_products.json'])
+
+    start = time.perf_counter()
+    index = PrefixIndex().build(products)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Indexed {len(index.keys)} name keys from {len(products)} products in {build_ms:.1f} ms")
+
+    prefix = ' '.join(sys.argv[1:]) or 'Sun'
+    start = time.perf_counter()
+    completions = index.complete(prefix)
+    elapsed_us = (time.perf_counter() - start) * 1_000_000
+
+    print(f"\n=== COMPLETIONS FOR '{prefix}' ({elapsed_us:.0f} µs) ===")
+    for display, field, product_id, rank in completions:
+        print(f"  {display}  [{field}, {product_id}, rank {rank}]")
+    if not completions:
+        print("  No completions found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Bengali Character N-gram Index
+Substring and partial-word search over the Bengali-script fields of the KB
+(kb_bengali_products.json) without a linear scan.
+
+Text is Unicode-normalized (NFC, zero-width joiners removed, Bengali digits
+folded to ASCII) and whitespace is dropped, so "গেইন ২০ এসএল" and
+"গেইন ২০এসএল" index the same. Every field value is split into character
+bigrams and trigrams; a query intersects the posting lists of its own
+n-grams and only the surviving candidates are checked with a substring
+test. When nothing contains the query exactly, candidates are ranked by the
+share of query trigrams they contain, which tolerates spelling variants.
+
+Usage:
+    python bengali_ngram_index.py "হপার"
+"""
+
+import json
+import sys
+import time
+import unicodedata
+from collections import defaultdict
+
+from separate_language_products import contains_bengali_script
+
+# Fields searched when they contain Bengali script
+BENGALI_FIELDS = ('product_name', 'crops', 'pest', 'symptoms', 'causes', 'side_effect', 'crops_pests')
+
+# Minimum share of query trigrams a candidate needs for an approximate match
+MIN_TRIGRAM_OVERLAP = 0.6
+
+_FOLD_TABLE = {
+    0x200C: None,  # zero width non-joiner
+    0x200D: None,  # zero width joiner
+    0x09CE: '\u09A4\u09CD',  # khanda ta -> ta + virama
+}
+_FOLD_TABLE.update({0x09E6 + digit: str(digit) for digit in range(10)})
+
+
+def normalize_bengali(text):
+    """NFC-normalize, fold joiners/digits/khanda ta and drop whitespace"""
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFC', text).translate(_FOLD_TABLE).lower()
+    return ''.join(text.split())
+
+
+def _ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class BengaliNgramIndex:
+    def __init__(self, fields=BENGALI_FIELDS):
+        self.fields = fields
+        # One entry per indexed (product, field): (product_id, field, normalized text, original text)
+        self.entries = []
+        self.postings = defaultdict(list)
+
+    def build(self, products):
+        for product in products:
+            for field in self.fields:
+                value = product.get(field)
+                if isinstance(value, list):
+                    value = ' '.join(str(item) for item in value)
+                if not value or not contains_bengali_script(value):
+                    continue
+                normalized = normalize_bengali(value)
+                entry_id = len(self.entries)
+                self.entries.append((product.get('product_id', ''), field, normalized, value))
+                for n in (2, 3):
+                    for gram in _ngrams(normalized, n):
+                        self.postings[gram].append(entry_id)
+        return self
+
+    def _candidates(self, grams):
+        posting_lists = sorted((self.postings.get(gram, []) for gram in grams), key=len)
+        if not posting_lists or not posting_lists[0]:
+            return set()
+        candidates = set(posting_lists[0])
+        for posting in posting_lists[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query, limit=10, approximate=True):
+        """
+        Find products whose Bengali fields contain the query.
+
+        Returns:
+            list: (product_id, field, original text, score) tuples; score is 1.0
+                  for exact substring hits and the trigram overlap otherwise
+        """
+        needle = normalize_bengali(query)
+        if len(needle) < 2:
+            return []
+
+        n = 3 if len(needle) >= 3 else 2
+        grams = _ngrams(needle, n)
+        hits = [
+            (entry_id, 1.0)
+            for entry_id in self._candidates(grams)
+            if needle in self.entries[entry_id][2]
+        ]
+
+        if not hits and approximate and n == 3:
+            counts = defaultdict(int)
+            for gram in grams:
+                for entry_id in set(self.postings.get(gram, ())):
+                    counts[entry_id] += 1
+            hits = [
+                (entry_id, count / len(grams))
+                for entry_id, count in counts.items()
+                if count / len(grams) >= MIN_TRIGRAM_OVERLAP
+            ]
+
+        hits.sort(key=lambda hit: (-hit[1], len(self.entries[hit[0]][2]), hit[0]))
+        results = []
+        seen = set()
+        for entry_id, score in hits:
+            product_id, field, _, original = self.entries[entry_id]
+            if (product_id, field) in seen:
+                continue
+            seen.add((product_id, field))
+            results.append((product_id, field, original, score))
+            if len(results) >= limit:
+                break
+        return results
+
+
+def main():
+    with open('kb_bengali_products.json', 'r', encoding='utf-8') as f:
+        products = json.load(f)
+
+    start = time.perf_counter()
+    index = BengaliNgramIndex().build(products)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Indexed {len(index.entries)} Bengali field values, {len(index.postings)} n-grams in {build_ms:.1f} ms")
+
+    query = ' '.join(sys.argv[1:]) or 'হপার'
+    start = time.perf_counter()
+    results = index.search(query)
+    elapsed_us = (time.perf_counter() - start) * 1_000_000
+
+    print(f"\n=== RESULTS FOR '{query}' ({elapsed_us:.0f} µs) ===")
+    for product_id, field, original, score in results:
+        snippet = original if len(original) <= 60 else original[:57] + '...'
+        print(f"  {product_id} [{field}] {snippet} ({score:.2f})")
+    if not results:
+        print("  No matches found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Size-Budgeted WebP/AVIF Encoder
+Picks the encoder quality per image instead of a fixed JPEG 95 / PNG:
+binary-searches the quality setting so the file fits a byte budget, or so
+it is the smallest one that still reaches an SSIM floor against the resized
+source (both limits can be combined; the byte budget wins).
+
+SSIM is computed with NumPy on the luma channel with 7x7 box windows built
+from integral images.
+
+Used by resize_engine.py; resize_images.py and process_images.py enable it with
+    --webp | --avif   [--max-kb 40] [--min-ssim 0.95]
+"""
+
+import io
+import json
+
+import numpy as np
+from PIL import Image, features
+
+MIN_QUALITY = 20
+MAX_QUALITY = 95
+
+# Encoder settings; AVIF speed trades encode time for size
+ENCODER_OPTIONS = {
+    'WEBP': {'method': 4},
+    'AVIF': {'speed': 6},
+}
+FORMAT_EXTENSIONS = {'WEBP': '.webp', 'AVIF': '.avif'}
+
+_SSIM_WINDOW = 7
+_SSIM_C1 = (0.01 * 255) ** 2
+_SSIM_C2 = (0.03 * 255) ** 2
+
+
+def available_format(image_format):
+    """image_format if Pillow can encode it, otherwise WEBP"""
+    if image_format == 'AVIF' and not features.check('avif'):
+        print("⚠️  AVIF encoder not available in this Pillow build, using WebP")
+        return 'WEBP'
+    return image_format
+
+
+def _box_mean(values, size=_SSIM_WINDOW):
+    """Mean over every size x size window (valid positions only)"""
+    integral = np.pad(values, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    window_sums = (integral[size:, size:] - integral[:-size, size:]
+                   - integral[size:, :-size] + integral[:-size, :-size])
+    return window_sums / (size * size)
+
+
+def ssim(reference, candidate):
+    """Mean SSIM of two same-sized PIL images, compared on luma"""
+    a = np.asarray(reference.convert('L'), dtype=np.float64)
+    b = np.asarray(candidate.convert('L'), dtype=np.float64)
+    if min(a.shape) < _SSIM_WINDOW:
+        return 1.0 if np.array_equal(a, b) else 0.0
+
+    mean_a, mean_b = _box_mean(a), _box_mean(b)
+    var_a = _box_mean(a * a) - mean_a ** 2
+    var_b = _box_mean(b * b) - mean_b ** 2
+    covariance = _box_mean(a * b) - mean_a * mean_b
+
+    numerator = (2 * mean_a * mean_b + _SSIM_C1) * (2 * covariance + _SSIM_C2)
+    denominator = (mean_a ** 2 + mean_b ** 2 + _SSIM_C1) * (var_a + var_b + _SSIM_C2)
+    return float(np.mean(numerator / denominator))
+
+
+def encode(img, image_format, quality):
+    buffer = io.BytesIO()
+    img.save(buffer, image_format, quality=quality, **ENCODER_OPTIONS.get(image_format, {}))
+    return buffer.getvalue()
+
+
+def encode_to_budget(img, image_format='WEBP', max_bytes=None, min_ssim=None,
+                     min_quality=MIN_QUALITY, max_quality=MAX_QUALITY):
+    """
+    Encode img at the quality chosen by the budget.
+
+    Args:
+        img (PIL.Image.Image): Image to encode (already resized)
+        image_format (str): 'WEBP' or 'AVIF'
+        max_bytes (int): Highest quality whose output fits this many bytes
+        min_ssim (float): Lowest quality whose output reaches this SSIM
+        min_quality, max_quality (int): Quality search range
+
+    Returns:
+        dict: data (bytes), quality, bytes, ssim and within_budget
+    """
+    encodings = {}
+    scores = {}
+
+    def attempt(quality):
+        if quality not in encodings:
+            encodings[quality] = encode(img, image_format, quality)
+        return encodings[quality]
+
+    def measured_ssim(quality):
+        if quality not in scores:
+            with Image.open(io.BytesIO(attempt(quality))) as decoded:
+                scores[quality] = ssim(img, decoded)
+        return scores[quality]
+
+    quality = max_quality
+    if min_ssim is not None:
+        # Lowest quality that still looks right
+        low, high = min_quality, max_quality
+        while low < high:
+            middle = (low + high) // 2
+            if measured_ssim(middle) >= min_ssim:
+                high = middle
+            else:
+                low = middle + 1
+        quality = low
+
+    if max_bytes is not None and len(attempt(quality)) > max_bytes:
+        # Highest quality that still fits
+        low, high = min_quality, quality
+        while low < high:
+            middle = (low + high + 1) // 2
+            if len(attempt(middle)) <= max_bytes:
+                low = middle
+            else:
+                high = middle - 1
+        quality = low
+
+    data = attempt(quality)
+    return {
+        'data': data,
+        'quality': quality,
+        'bytes': len(data),
+        'ssim': round(measured_ssim(quality), 4),
+        'within_budget': (max_bytes is None or len(data) <= max_bytes)
+                         and (min_ssim is None or measured_ssim(quality) >= min_ssim),
+    }
+
+
+def parse_output_args(argv):
+    """
+    Output options from command-line flags.
+
+    Returns:
+        dict: image_format and budget keyword arguments for resize_engine.resize_images,
+              or an empty dict when no budget format was requested
+    """
+    options = {}
+    if '--webp' in argv:
+        options['image_format'] = 'WEBP'
+    if '--avif' in argv:
+        options['image_format'] = available_format('AVIF')
+    if not options:
+        return options
+
+    budget = {}
+    for flag, key, convert in (('--max-kb', 'max_bytes', lambda v: int(float(v) * 1024)),
+                               ('--min-ssim', 'min_ssim', float)):
+        if flag in argv and argv.index(flag) + 1 < len(argv):
+            budget[key] = convert(argv[argv.index(flag) + 1])
+    options['budget'] = budget
+    return options
+
+
+def write_encoding_report(stats, path):
+    """Save the per-image size/quality results of a budgeted resize run"""
+    encodings = stats.get('encodings', [])
+    report = {
+        'summary': {
+            'images': len(encodings),
+            'source_bytes': sum(e['source_bytes'] for e in encodings),
+            'output_bytes': sum(e['bytes'] for e in encodings),
+            'mean_quality': round(sum(e['quality'] for e in encodings) / len(encodings), 1) if encodings else None,
+            'mean_ssim': round(sum(e['ssim'] for e in encodings) / len(encodings), 4) if encodings else None,
+            'outside_budget': sum(not e['within_budget'] for e in encodings),
+        },
+        'images': sorted(encodings, key=lambda e: e['output']),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Incremental Image Build Manifest
+Remembers, for every generated image, which source it came from (path,
+size, mtime and SHA-1 of the content) and the output parameters it was
+built with (size, format, quality...).
+
+A job is skipped when its output still exists and neither the source nor
+the parameters changed. A touched-but-identical source is detected by its
+hash and only has its mtime refreshed. Outputs whose recorded source file
+no longer exists are deleted; outputs that are merely not part of this run
+(another output format, a narrower job list) are kept.
+
+Entries are keyed by output path, so two sources that resolve to the same
+output (X.jpg and X.png -> X.jpg) would overwrite each other's entry and
+both rebuild on every run. plan() keeps the first job for each output and
+reports the others in conflicts instead of building them.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def file_sha1(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def params_key(params):
+    """Canonical string for output parameters so dict order and tuples/lists do not matter"""
+    return json.dumps(params, sort_keys=True, default=list)
+
+
+class BuildManifest:
+    def __init__(self, path, params):
+        """
+        Args:
+            path (str): Manifest JSON file
+            params (dict): Output parameters of this build
+        """
+        self.path = path
+        self.params = params_key(params)
+        self.entries = {}
+        self._pending_hashes = {}
+        # (skipped input_path, output_path, input_path that builds it) from the last plan()
+        self.conflicts = []
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def _is_current(self, input_path, output_path, stat):
+        entry = self.entries.get(output_path)
+        if not entry or entry['params'] != self.params or entry['source'] != input_path:
+            return False
+        if entry['size'] != stat.st_size or not os.path.exists(output_path):
+            return False
+        if entry['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        # Touched (copied, checked out...) but possibly unchanged
+        sha1 = self._pending_hashes[output_path] = file_sha1(input_path)
+        if sha1 == entry['sha1']:
+            entry['mtime_ns'] = stat.st_mtime_ns
+            return True
+        return False
+
+    def plan(self, jobs):
+        """
+        Split (input_path, output_path) jobs into the ones to rebuild and the ones to skip.
+
+        Returns:
+            tuple: (jobs to run, number of skipped jobs)
+        """
+        todo = []
+        skipped = 0
+        owners = {}
+        self.conflicts = []
+        for input_path, output_path in jobs:
+            if output_path in owners:
+                self.conflicts.append((input_path, output_path, owners[output_path]))
+                continue
+            owners[output_path] = input_path
+            stat = os.stat(input_path)
+            if self._is_current(input_path, output_path, stat):
+                skipped += 1
+            else:
+                todo.append((input_path, output_path))
+        return todo, skipped
+
+    def record(self, input_path, output_path):
+        """Remember a successfully built output"""
+        stat = os.stat(input_path)
+        sha1 = self._pending_hashes.pop(output_path, None) or file_sha1(input_path)
+        self.entries[output_path] = {
+            'source': input_path,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha1': sha1,
+            'params': self.params,
+        }
+
+    def forget(self, output_path):
+        self.entries.pop(output_path, None)
+
+    def prune(self):
+        """
+        Delete outputs whose recorded source file no longer exists.
+
+        Returns:
+            list: Removed output paths
+        """
+        removed = []
+        for output_path, entry in sorted(self.entries.items()):
+            if os.path.exists(entry['source']):
+                continue
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            removed.append(output_path)
+            del self.entries[output_path]
+        return removed
+
+    def save(self):
+        manifest_dir = os.path.dirname(self.path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
@@ -1,6 +1,16 @@
 import json
+import os
 import re
+import textwrap
+from collections import deque
 from datetime import datetime
+from multiprocessing import Pool
+
+# Bytes read from kb.json at a time while parsing crop sections
+READ_CHUNK_SIZE = 1 << 16
+
+# Crop sections in flight per worker; bounds how much of the KB is in memory at once
+CROPS_PER_WORKER = 2
 
 def extract_product_id_from_name(product_name):
     """Extract or generate product ID from product name"""
@@ -30,70 +40,173 @@ def extract_tags_from_data(product_name, medicine_name, crop, pest):
     if pest:
         tags.append(pest.lower())
     
-    return list(set(tags))  # Remove duplicates
+    return list(dict.fromkeys(tags))  # Remove duplicates, keeping a stable order
 
-def convert_kb_to_products():
-    # Read the kb.json file
-    with open('kb.json', 'r', encoding='utf-8') as f:
-        kb_data = json.load(f)
-    
+def iter_crops(kb_path):
+    """
+    Yield (crop_name, crop_data) from the top-level object of kb_path one
+    crop at a time, so only the section being parsed is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    with open(kb_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        eof = False
+        
+        def fill(size):
+            nonlocal buffer, eof
+            chunk = f.read(max(READ_CHUNK_SIZE, size))
+            eof = not chunk
+            buffer += chunk
+        
+        def next_char():
+            """First non-whitespace character ('' at end of file), left in the buffer"""
+            nonlocal buffer
+            while True:
+                buffer = buffer.lstrip()
+                if buffer or eof:
+                    return buffer[:1]
+                fill(0)
+        
+        def expect(chars):
+            nonlocal buffer
+            char = next_char()
+            if not char or char not in chars:
+                raise ValueError(f"{kb_path}: expected one of {chars!r}, found {char or 'end of file'!r}")
+            buffer = buffer[1:]
+            return char
+        
+        def read_value():
+            nonlocal buffer
+            next_char()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer)
+                    # A value touching the end of the buffer may be cut short (a number)
+                    if end < len(buffer) or eof:
+                        buffer = buffer[end:]
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                # Double the buffer so a long section is still read in linear time
+                fill(len(buffer))
+        
+        expect('{')
+        if next_char() == '}':
+            return
+        while True:
+            crop_name = read_value()
+            expect(':')
+            yield crop_name, read_value()
+            if expect(',}') == '}':
+                return
+
+def count_crop_products(crop_data):
+    """Number of products a crop section will produce"""
+    return sum(len(pest_entry['products']) for pest_entry in crop_data if 'products' in pest_entry)
+
+def convert_crop(task):
+    """Convert one crop section; runs in a worker process"""
+    crop_name, crop_data, first_serial, extraction_date = task
     products = []
-    product_id_counter = 1
+    product_id_counter = first_serial
     
-    for crop_name, crop_data in kb_data.items():
-        if isinstance(crop_data, list):
-            for pest_entry in crop_data:
-                pest_name = pest_entry.get('pest', '')
-                symptoms = pest_entry.get('symptoms', '')
-                causes = pest_entry.get('causes', '')
+    for pest_entry in crop_data:
+        pest_name = pest_entry.get('pest', '')
+        symptoms = pest_entry.get('symptoms', '')
+        causes = pest_entry.get('causes', '')
+        
+        if 'products' in pest_entry:
+            for product in pest_entry['products']:
+                product_name = product.get('product_name', '')
+                medicine_name = product.get('medicine_name', '')
+                application_rates = product.get('application_rates', '')
+                frequency_of_use = product.get('frequency_of_use', '')
+                safety_precautions = product.get('safety_precautions', '')
                 
-                if 'products' in pest_entry:
-                    for product in pest_entry['products']:
-                        product_name = product.get('product_name', '')
-                        medicine_name = product.get('medicine_name', '')
-                        application_rates = product.get('application_rates', '')
-                        frequency_of_use = product.get('frequency_of_use', '')
-                        safety_precautions = product.get('safety_precautions', '')
-                        
-                        # Generate product ID
-                        product_id = f"KB-{product_id_counter:03d}"
-                        product_id_counter += 1
-                        
-                        # Create product entry
-                        product_entry = {
-                            "product_id": product_id,
-                            "product_name": clean_text(product_name),
-                            "product_image": "",  # Empty for now
-                            "common_name": clean_text(medicine_name),
-                            "category_name": "",  # Will need to be determined based on medicine type
-                            "description": "",  # Empty for now
-                            "application_rates": clean_text(application_rates),
-                            "frequency_of_use": clean_text(frequency_of_use),
-                            "side_effect": clean_text(safety_precautions),
-                            "crops_pests": clean_text(f"{crop_name} - {pest_name}"),
-                            "crops": clean_text(crop_name),
-                            "pest": clean_text(pest_name),
-                            "symptoms": clean_text(symptoms),
-                            "causes": clean_text(causes),
-                            "product_tags": extract_tags_from_data(product_name, medicine_name, crop_name, pest_name),
-                            "product_price": "",  # Empty for now
-                            "reg_no": "",  # Empty for now
-                            "serial_no": str(product_id_counter - 1),
-                            "product_url": "",  # Empty for now
-                            "origin": "",  # Empty for now
-                            "isActive": "true",
-                            "Stocks": "3654",
-                            "extraction_date": datetime.now().isoformat()
-                        }
-                        
-                        products.append(product_entry)
-    
-    # Write to new file
-    with open('kb_converted_products.json', 'w', encoding='utf-8') as f:
-        json.dump(products, f, indent=2, ensure_ascii=False)
+                # Generate product ID from this crop's reserved range
+                product_id = f"KB-{product_id_counter:03d}"
+                product_id_counter += 1
+                
+                # Create product entry
+                product_entry = {
+                    "product_id": product_id,
+                    "product_name": clean_text(product_name),
+                    "product_image": "",  # Empty for now
+                    "common_name": clean_text(medicine_name),
+                    "category_name": "",  # Will need to be determined based on medicine type
+                    "description": "",  # Empty for now
+                    "application_rates": clean_text(application_rates),
+                    "frequency_of_use": clean_text(frequency_of_use),
+                    "side_effect": clean_text(safety_precautions),
+                    "crops_pests": clean_text(f"{crop_name} - {pest_name}"),
+                    "crops": clean_text(crop_name),
+                    "pest": clean_text(pest_name),
+                    "symptoms": clean_text(symptoms),
+                    "causes": clean_text(causes),
+                    "product_tags": extract_tags_from_data(product_name, medicine_name, crop_name, pest_name),
+                    "product_price": "",  # Empty for now
+                    "reg_no": "",  # Empty for now
+                    "serial_no": str(product_id_counter - 1),
+                    "product_url": "",  # Empty for now
+                    "origin": "",  # Empty for now
+                    "isActive": "true",
+                    "Stocks": "3654",
+                    "extraction_date": extraction_date
+                }
+                
+                products.append(product_entry)
     
-    print(f"Converted {len(products)} products from kb.json to kb_converted_products.json")
     return products
 
+def convert_kb_to_products(kb_path='kb.json', json_path='kb_converted_products.json',
+                           jsonl_path='kb_converted_products.jsonl', workers=None):
+    """
+    Convert kb.json to product records, one crop per worker process.
+    
+    kb.json is parsed one crop section at a time and only a few sections per
+    worker are in flight, so memory stays bounded by the largest crop, not
+    the whole KB. Each crop gets a contiguous ID range from the product
+    counts of the crops before it, so IDs match a serial run no matter which
+    worker finishes first. Records are streamed to JSONL and to the JSON
+    array as they arrive.
+    """
+    extraction_date = datetime.now().isoformat()
+    workers = workers or os.cpu_count() or 1
+    
+    def tasks():
+        # Reserve an ID range for every crop as it is parsed
+        next_serial = 1
+        for crop_name, crop_data in iter_crops(kb_path):
+            if isinstance(crop_data, list):
+                yield crop_name, crop_data, next_serial, extraction_date
+                next_serial += count_crop_products(crop_data)
+    
+    def results(pool):
+        # Submit crops through a fixed window (Pool.imap would read every crop ahead) and keep crop order
+        pending = deque()
+        for task in tasks():
+            pending.append(pool.apply_async(convert_crop, (task,)))
+            if len(pending) >= workers * CROPS_PER_WORKER:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    
+    converted = 0
+    with Pool(processes=workers) as pool, \
+            open(json_path, 'w', encoding='utf-8') as json_file, \
+            open(jsonl_path, 'w', encoding='utf-8') as jsonl_file:
+        json_file.write('[')
+        for products in results(pool):
+            for product_entry in products:
+                jsonl_file.write(json.dumps(product_entry, ensure_ascii=False) + '\n')
+                json_file.write(',\n' if converted else '\n')
+                json_file.write(textwrap.indent(json.dumps(product_entry, indent=2, ensure_ascii=False), '  '))
+                converted += 1
+        json_file.write('\n]' if converted else ']')
+    
+    print(f"Converted {converted} products from {kb_path} to {json_path} and {jsonl_path}")
+    return converted
+
 if __name__ == "__main__":
     convert_kb_to_products()
@@ -1,50 +1,7 @@
 import json
-import re
 from collections import defaultdict
 
-def normalize_text(text):
-    """Normalize text for comparison - remove special characters, convert to lowercase"""
-    if not text:
-        return ""
-    # Remove special characters and extra spaces
-    normalized = re.sub(r'[^\w\s]', ' ', text.lower())
-    # Remove extra whitespace
-    normalized = ' '.join(normalized.split())
-    return normalized
-
-def is_english_bangla_variant(text1, text2):
-    """Check if two texts are English-Bangla variants of the same product"""
-    # Common patterns that might indicate English-Bangla variants
-    # This is a basic check - you might need to refine this based on actual data
-    
-    # Remove common suffixes/prefixes for comparison
-    suffixes_to_remove = ['ec', 'wp', 'sl', 'sp', 'wg', 'sc', 'gr', 'df', 'se', 'wdg']
-    
-    def clean_for_variant_check(text):
-        text = text.lower()
-        for suffix in suffixes_to_remove:
-            text = text.replace(suffix, '')
-        return text.strip()
-    
-    clean1 = clean_for_variant_check(text1)
-    clean2 = clean_for_variant_check(text2)
-    
-    # If one is significantly shorter and contained in the other, might be variant
-    if len(clean1) > len(clean2) * 2 or len(clean2) > len(clean1) * 2:
-        return False
-    
-    # Check if they share significant common words (at least 60% similarity)
-    words1 = set(clean1.split())
-    words2 = set(clean2.split())
-    
-    if not words1 or not words2:
-        return False
-    
-    common_words = words1.intersection(words2)
-    similarity = len(common_words) / max(len(words1), len(words2))
-    
-    # If similarity is high but not identical, might be English-Bangla variant
-    return 0.6 <= similarity < 1.0
+from text_normalization import normalize_text, is_english_bangla_variant
 
 def find_duplicate_products():
     # Read the converted products
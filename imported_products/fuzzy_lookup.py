@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Typo-Tolerant Product Lookup
+SymSpell-style deletion dictionary over normalized product names. Every
+catalog key is stored under all of its deletions (up to the maximum edit
+distance) of its first few characters. A query generates its own deletions
+and only the keys sharing one of them are verified with a real edit
+distance, so latency depends on the query length, not the catalog size.
+
+Names are compared on text_normalization.name_key(), which makes
+"ACTIVER_25_EC.json", "Activer 25 EC" and "Activar 25EC" one edit apart.
+The brand word of each name is indexed too, so "McZic" finds "McZic_GA3".
+
+Usage:
+    python fuzzy_lookup.py "Activar 25EC"
+"""
+
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+from text_normalization import name_key, normalize_text
+
+MAX_EDIT_DISTANCE = 2
+# Only this many leading characters are expanded into deletions
+PREFIX_LENGTH = 7
+
+
+def _deletes(word, max_distance):
+    """All strings reachable from word by deleting up to max_distance characters"""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for candidate in frontier:
+            if len(candidate) <= 1:
+                continue
+            for i in range(len(candidate)):
+                next_frontier.add(candidate[:i] + candidate[i + 1:])
+        next_frontier -= results
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions).
+
+    Returns max_distance + 1 as soon as the distance is known to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyNameIndex:
+    def __init__(self, max_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        # key -> list of (payload, original name, is_brand_key)
+        self.keys = defaultdict(list)
+        # deletion of a key prefix -> set of keys
+        self.deletes = defaultdict(set)
+
+    def add(self, name, payload=None):
+        """Register a name; payload (e.g. product_id) is returned on a match"""
+        key = name_key(name)
+        if not key:
+            return
+        self._add_key(key, (payload, name, False))
+
+        # The leading word alone, so partial names still find their product
+        words = normalize_text(name.replace('_', ' ')).split()
+        if len(words) > 1 and len(words[0]) > 2:
+            self._add_key(words[0], (payload, name, True))
+
+    def _add_key(self, key, entry):
+        if key not in self.keys:
+            for deletion in _deletes(key[:self.prefix_length], self.max_distance):
+                self.deletes[deletion].add(key)
+        if entry not in self.keys[key]:
+            self.keys[key].append(entry)
+
+    def build(self, products, fields=('product_name',), payload_field='product_id'):
+        for product in products:
+            for field in fields:
+                if product.get(field):
+                    self.add(product[field], product.get(payload_field))
+        return self
+
+    def lookup(self, query, max_distance=None, limit=5):
+        """
+        Find the closest catalog names to a possibly misspelled query.
+
+        Returns:
+            list: (payload, name, distance) tuples, closest first
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        key = name_key(query)
+        if not key:
+            return []
+
+        candidates = set()
+        for deletion in _deletes(key[:self.prefix_length], max_distance):
+            candidates |= self.deletes.get(deletion, set())
+
+        matches = {}
+        for candidate in candidates:
+            distance = edit_distance(key, candidate, max_distance)
+            if distance > max_distance:
+                continue
+            for payload, name, is_brand_key in self.keys[candidate]:
+                # Exact full-name matches beat brand-only matches at equal distance
+                rank = (distance, is_brand_key, abs(len(candidate) - len(key)))
+                if name not in matches or rank < matches[name][0]:
+                    matches[name] = (rank, payload)
+
+        ranked = sorted(matches.items(), key=lambda item: (item[1][0], item[0]))
+        return [(payload, name, rank[0]) for name, (rank, payload) in ranked[:limit]]
+
+    def best_match(self, query, max_distance=None):
+        """Closest (payload, name, distance), or None when nothing is within range"""
+        matches = self.lookup(query, max_distance, limit=1)
+        return matches[0] if matches else None
+
+
+def main():
+    products = []
+    for path in ['products_data.json', 'kb_english_products.json']:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                products.extend(json.load(f))
+
+    start = time.perf_counter()
+    index = FuzzyNameIndex().build(products)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Indexed {len(index.keys)} name keys ({len(index.deletes)} deletions) in {build_ms:.1f} ms")
+
+    query = ' '.join(sys.argv[1:]) or 'Activar 25EC'
+    start = time.perf_counter()
+    matches = index.lookup(query)
+    elapsed_us = (time.perf_counter() - start) * 1_000_000
+
+    print(f"\n=== MATCHES FOR '{query}' ({elapsed_us:.0f} µs) ===")
+    for payload, name, distance in matches:
+        print(f"  {payload} - {name} (distance {distance})")
+    if not matches:
+        print(f"  No product within edit distance {index.max_distance}")
+
+
+if __name__ == "__main__":
+    main()
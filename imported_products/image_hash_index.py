@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Perceptual Image Hash Index
+Finds near-identical product photos across all image folders, whatever
+their size or format, and reports which copies are redundant.
+
+Every image is decoded once at low resolution (JPEG draft mode, grayscale,
+transparent backgrounds flattened onto white) and gets two 256-bit hashes
+computed with NumPy:
+  - dHash: sign of horizontal gradients on a 17x16 thumbnail
+  - pHash: low 16x16 DCT coefficients of a 64x64 thumbnail against their median
+
+16x16 hashes are used rather than the classic 8x8 ones because many
+different products share the same bottle shape on a white background; at
+8x8 they collide, at 16x16 true copies stay within a few bits while
+different labels are 15+ bits apart.
+
+Candidate pairs come from a multi-index Hamming lookup on the dHash: the
+bits are split into threshold + 1 segments, and by the pigeonhole principle
+any two hashes within the threshold agree exactly on at least one segment,
+so only images sharing a segment bucket are compared. Pairs confirmed by the
+pHash are merged into clusters with union-find.
+
+Usage:
+    python image_hash_index.py [folder ...]
+"""
+
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+from PIL import Image
+
+from resize_engine import CHUNKS_PER_WORKER, IMAGE_EXTENSIONS, find_images, to_rgb
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Searched folders, most authoritative first (the first copy found in a folder
+# higher up this list is kept when copies have the same resolution)
+DEFAULT_FOLDERS = (
+    'MBL/images',
+    'FinalProjectandData/images',
+    'imported_products/images',
+    'imported_products/main',
+    'zMBL Product Images',
+    'RAW Images',
+    'imported_products/Old',
+    'FinalProjectandData_backup/images',
+)
+
+HASH_SIZE = 16
+HASH_BITS = HASH_SIZE * HASH_SIZE
+DHASH_THRESHOLD = 10
+PHASH_THRESHOLD = 20
+
+_DCT_SIZE = 4 * HASH_SIZE
+_DCT_MATRIX = np.sqrt(2.0 / _DCT_SIZE) * np.cos(
+    np.pi * np.outer(np.arange(_DCT_SIZE), 2 * np.arange(_DCT_SIZE) + 1) / (2 * _DCT_SIZE)
+)
+
+
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), 'big')
+
+
+def dhash(gray):
+    """dHash of a grayscale PIL image"""
+    pixels = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS), dtype=np.int16)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(gray):
+    """pHash of a grayscale PIL image"""
+    pixels = np.asarray(gray.resize((_DCT_SIZE, _DCT_SIZE), Image.Resampling.LANCZOS), dtype=np.float64)
+    low = (_DCT_MATRIX @ pixels @ _DCT_MATRIX.T)[:HASH_SIZE, :HASH_SIZE]
+    # The DC term only carries overall brightness
+    median = np.median(low.ravel()[1:])
+    return _bits_to_int(low > median)
+
+
+def hash_image(path):
+    """
+    Returns:
+        dict: path, bytes, width, height, dhash and phash (or error)
+    """
+    record = {'path': path, 'bytes': os.path.getsize(path)}
+    try:
+        with Image.open(path) as img:
+            record['width'], record['height'] = img.size
+            if img.format == 'JPEG':
+                img.draft('L', (2 * _DCT_SIZE, 2 * _DCT_SIZE))
+            gray = to_rgb(img, (255, 255, 255)).convert('L')
+            record['dhash'] = dhash(gray)
+            record['phash'] = phash(gray)
+    except Exception as e:
+        record['error'] = str(e)
+    return record
+
+
+def hash_images(paths, workers=None):
+    workers = max(1, min(workers or cpu_count(), len(paths) or 1))
+    chunksize = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+    with Pool(workers) as pool:
+        return list(pool.imap(hash_image, paths, chunksize=chunksize))
+
+
+class HammingIndex:
+    """Multi-index hashing: exact-match buckets on hash segments for radius queries"""
+
+    def __init__(self, threshold=DHASH_THRESHOLD, bits=HASH_BITS):
+        self.threshold = threshold
+        segment_count = threshold + 1
+        bounds = [round(i * bits / segment_count) for i in range(segment_count + 1)]
+        self.segments = [(start, (1 << (end - start)) - 1) for start, end in zip(bounds, bounds[1:])]
+        self.buckets = [defaultdict(list) for _ in self.segments]
+        self.hashes = []
+
+    def _keys(self, value):
+        return [(value >> start) & mask for start, mask in self.segments]
+
+    def add(self, value):
+        item = len(self.hashes)
+        self.hashes.append(value)
+        for buckets, key in zip(self.buckets, self._keys(value)):
+            buckets[key].append(item)
+        return item
+
+    def query(self, value, threshold=None):
+        """Items within threshold (at most the index threshold) of value, as (item, distance)"""
+        threshold = self.threshold if threshold is None else min(threshold, self.threshold)
+        candidates = set()
+        for buckets, key in zip(self.buckets, self._keys(value)):
+            candidates.update(buckets.get(key, ()))
+        matches = []
+        for item in candidates:
+            distance = (self.hashes[item] ^ value).bit_count()
+            if distance <= threshold:
+                matches.append((item, distance))
+        return sorted(matches, key=lambda match: (match[1], match[0]))
+
+    def pairs(self):
+        """All (i, j) item pairs within the threshold, i < j"""
+        seen = set()
+        for buckets in self.buckets:
+            for members in buckets.values():
+                for offset, i in enumerate(members):
+                    for j in members[offset + 1:]:
+                        if (i, j) in seen:
+                            continue
+                        seen.add((i, j))
+                        if (self.hashes[i] ^ self.hashes[j]).bit_count() <= self.threshold:
+                            yield i, j
+
+
+def cluster_duplicates(records, dhash_threshold=DHASH_THRESHOLD, phash_threshold=PHASH_THRESHOLD):
+    """
+    Group records (from hash_image) of near-identical images.
+
+    Returns:
+        list: Clusters (lists of record indexes) with more than one image
+    """
+    index = HammingIndex(dhash_threshold)
+    items = []
+    for position, record in enumerate(records):
+        if 'error' not in record:
+            index.add(record['dhash'])
+            items.append(position)
+
+    parent = list(range(len(items)))
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for i, j in index.pairs():
+        if (records[items[i]]['phash'] ^ records[items[j]]['phash']).bit_count() <= phash_threshold:
+            parent[find(i)] = find(j)
+
+    groups = defaultdict(list)
+    for item in range(len(items)):
+        groups[find(item)].append(items[item])
+    return [sorted(group) for group in groups.values() if len(group) > 1]
+
+
+def _keep_rank(record, folder_rank):
+    """Keep the largest resolution, then the most authoritative folder, then the smallest file"""
+    return (-record['width'] * record['height'], folder_rank, record['bytes'], record['path'])
+
+
+def build_report(folders):
+    paths = []
+    folder_of = {}
+    for rank, folder in enumerate(folders):
+        for path in find_images(folder, IMAGE_EXTENSIONS + ('.webp', '.gif')):
+            # Skip generated size folders such as MBL/images/256
+            if os.path.basename(os.path.dirname(path)).isdigit():
+                continue
+            paths.append(path)
+            folder_of[path] = rank
+
+    start = time.perf_counter()
+    records = hash_images(paths)
+    hash_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clusters = cluster_duplicates(records)
+    cluster_seconds = time.perf_counter() - start
+
+    report_clusters = []
+    redundant_bytes = 0
+    redundant_files = 0
+    for cluster in clusters:
+        members = sorted((records[i] for i in cluster), key=lambda r: _keep_rank(r, folder_of[r['path']]))
+        keep, redundant = members[0], members[1:]
+        redundant_files += len(redundant)
+        redundant_bytes += sum(r['bytes'] for r in redundant)
+        report_clusters.append({
+            'keep': os.path.relpath(keep['path'], REPO_ROOT),
+            'keep_size': f"{keep['width']}x{keep['height']}",
+            'redundant': [
+                {
+                    'path': os.path.relpath(r['path'], REPO_ROOT),
+                    'size': f"{r['width']}x{r['height']}",
+                    'bytes': r['bytes'],
+                    'dhash_distance': (r['dhash'] ^ keep['dhash']).bit_count(),
+                    'phash_distance': (r['phash'] ^ keep['phash']).bit_count(),
+                }
+                for r in redundant
+            ],
+        })
+    report_clusters.sort(key=lambda c: (-len(c['redundant']), c['keep']))
+
+    return {
+        'summary': {
+            'images_scanned': len(records),
+            'unreadable_images': sum('error' in r for r in records),
+            'duplicate_clusters': len(clusters),
+            'redundant_copies': redundant_files,
+            'redundant_bytes': redundant_bytes,
+            'hash_seconds': round(hash_seconds, 2),
+            'cluster_seconds': round(cluster_seconds, 3),
+            'dhash_threshold': DHASH_THRESHOLD,
+            'phash_threshold': PHASH_THRESHOLD,
+        },
+        'unreadable': [
+            {'path': os.path.relpath(r['path'], REPO_ROOT), 'error': r['error']}
+            for r in records if 'error' in r
+        ],
+        'clusters': report_clusters,
+    }
+
+
+def main():
+    folders = sys.argv[1:] or [os.path.join(REPO_ROOT, folder) for folder in DEFAULT_FOLDERS]
+    folders = [folder for folder in folders if os.path.isdir(folder)]
+
+    report = build_report(folders)
+    summary = report['summary']
+
+    print("=== IMAGE DUPLICATE ANALYSIS ===")
+    print(f"Images scanned: {summary['images_scanned']} in {len(folders)} folders")
+    print(f"Hashing: {summary['hash_seconds']}s, clustering: {summary['cluster_seconds']}s")
+    print(f"Unreadable images: {summary['unreadable_images']}")
+    print(f"Duplicate clusters: {summary['duplicate_clusters']}")
+    print(f"Redundant copies: {summary['redundant_copies']} ({summary['redundant_bytes'] / 1e6:.1f} MB)")
+
+    print(f"\n=== LARGEST CLUSTERS ===")
+    for cluster in report['clusters'][:10]:
+        print(f"{cluster['keep']} ({cluster['keep_size']}) - {len(cluster['redundant'])} redundant copies")
+        for copy in cluster['redundant'][:5]:
+            print(f"  {copy['path']} ({copy['size']}, d={copy['dhash_distance']}/{copy['phash_distance']})")
+
+    with open('image_duplicates_report.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nReport saved to: image_duplicates_report.json")
+
+
+if __name__ == "__main__":
+    main()
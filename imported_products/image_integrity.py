@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Image Integrity Scanner
+Finds broken image files before a resize batch trips over them.
+
+Every image in the repository is checked in parallel workers:
+  1. Header pass (always): format, dimensions and mode from the header, the
+     format against the file extension, size limits, and the end-of-file
+     marker of JPEG (FFD9) and PNG (IEND) files - no pixel decoding.
+  2. Decode pass (--full): Image.verify() plus a full decode, which catches
+     corrupt or truncated data in the middle of the file.
+
+Problems are written to image_integrity_report.json grouped as corrupt,
+truncated, oversized and wrong_extension.
+
+Usage:
+    python image_integrity.py [--full] [folder ...]
+"""
+
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool, cpu_count
+
+from PIL import Image
+
+from resize_engine import CHUNKS_PER_WORKER, IMAGE_EXTENSIONS, find_images
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCANNED_EXTENSIONS = IMAGE_EXTENSIONS + ('.gif', '.webp')
+
+# Extensions a Pillow format may be stored under
+FORMAT_EXTENSIONS = {
+    'JPEG': ('.jpg', '.jpeg'),
+    'PNG': ('.png',),
+    'GIF': ('.gif',),
+    'BMP': ('.bmp',),
+    'TIFF': ('.tif', '.tiff'),
+    'WEBP': ('.webp',),
+    'MPO': ('.jpg', '.jpeg'),
+}
+
+# Product photos larger than this are flagged as oversized
+MAX_DIMENSION = 4096
+MAX_FILE_BYTES = 10 * 1024 * 1024
+
+_TAIL_BYTES = 64
+
+
+def _has_end_marker(path, image_format):
+    """False when a JPEG/PNG file does not end with its end marker (cut off while copying/downloading)"""
+    if image_format not in ('JPEG', 'MPO', 'PNG'):
+        return True
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - _TAIL_BYTES))
+        tail = f.read()
+    if image_format == 'PNG':
+        return b'IEND' in tail
+    # Some encoders pad after EOI, so look for it near the end rather than at the last two bytes
+    return b'\xff\xd9' in tail
+
+
+def scan_image(task):
+    """
+    Check one image.
+
+    Args:
+        task (tuple): (path, full decode pass or not)
+
+    Returns:
+        dict: path, bytes, format/size/mode when readable and a list of problems
+    """
+    path, full = task
+    record = {'path': path, 'bytes': os.path.getsize(path), 'problems': []}
+    problems = record['problems']
+
+    try:
+        with Image.open(path) as img:
+            record['format'] = img.format
+            record['width'], record['height'] = img.size
+            record['mode'] = img.mode
+    except Exception as e:
+        problems.append({'type': 'corrupt', 'detail': f"unreadable header: {e}"})
+        return record
+
+    extension = os.path.splitext(path)[1].lower()
+    expected = FORMAT_EXTENSIONS.get(record['format'], ())
+    if extension not in expected:
+        problems.append({
+            'type': 'wrong_extension',
+            'detail': f"{record['format']} data in a {extension} file",
+            'suggested_extension': expected[0] if expected else None,
+        })
+
+    if max(record['width'], record['height']) > MAX_DIMENSION or record['bytes'] > MAX_FILE_BYTES:
+        problems.append({
+            'type': 'oversized',
+            'detail': f"{record['width']}x{record['height']}, {record['bytes'] / 1e6:.1f} MB",
+        })
+
+    if not _has_end_marker(path, record['format']):
+        problems.append({'type': 'truncated', 'detail': 'missing end-of-image marker'})
+
+    if full:
+        try:
+            # verify() leaves the image unusable, so decode from a fresh handle
+            with Image.open(path) as img:
+                img.verify()
+            with Image.open(path) as img:
+                img.load()
+        except Exception as e:
+            message = str(e)
+            problem_type = 'truncated' if 'truncated' in message.lower() else 'corrupt'
+            if not any(problem['type'] == problem_type for problem in problems):
+                problems.append({'type': problem_type, 'detail': message})
+
+    return record
+
+
+def scan_images(paths, full=False, workers=None):
+    workers = max(1, min(workers or cpu_count(), len(paths) or 1))
+    chunksize = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+    with Pool(workers) as pool:
+        return list(pool.imap(scan_image, [(path, full) for path in paths], chunksize=chunksize))
+
+
+def find_repo_images(folders):
+    paths = []
+    for folder in folders:
+        paths.extend(
+            path for path in find_images(folder, SCANNED_EXTENSIONS)
+            if '.git' not in path.split(os.sep)
+        )
+    return sorted(set(paths))
+
+
+def build_report(records, full, seconds):
+    report = {
+        'summary': {
+            'images_scanned': len(records),
+            'full_decode': full,
+            'seconds': round(seconds, 2),
+        },
+        'corrupt': [],
+        'truncated': [],
+        'oversized': [],
+        'wrong_extension': [],
+    }
+    for record in records:
+        for problem in record['problems']:
+            entry = {'path': os.path.relpath(record['path'], REPO_ROOT), 'bytes': record['bytes']}
+            for field in ('format', 'width', 'height', 'mode'):
+                if field in record:
+                    entry[field] = record[field]
+            entry.update({key: value for key, value in problem.items() if key != 'type'})
+            report[problem['type']].append(entry)
+    for problem_type in ('corrupt', 'truncated', 'oversized', 'wrong_extension'):
+        report['summary'][problem_type] = len(report[problem_type])
+    return report
+
+
+def main():
+    args = sys.argv[1:]
+    full = '--full' in args
+    folders = [arg for arg in args if arg != '--full'] or [REPO_ROOT]
+
+    paths = find_repo_images(folders)
+    start = time.perf_counter()
+    records = scan_images(paths, full=full)
+    report = build_report(records, full, time.perf_counter() - start)
+    summary = report['summary']
+
+    print("=== IMAGE INTEGRITY SCAN ===")
+    print(f"Images scanned: {summary['images_scanned']} ({'header + full decode' if full else 'header only'})")
+    print(f"Time: {summary['seconds']}s")
+    for problem_type in ('corrupt', 'truncated', 'oversized', 'wrong_extension'):
+        print(f"{problem_type.replace('_', ' ').capitalize()}: {summary[problem_type]}")
+        for entry in report[problem_type][:5]:
+            print(f"  {entry['path']} - {entry['detail']}")
+        if len(report[problem_type]) > 5:
+            print(f"  ... and {len(report[problem_type]) - 5} more")
+
+    with open('image_integrity_report.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nReport saved to: image_integrity_report.json")
+
+
+if __name__ == "__main__":
+    main()
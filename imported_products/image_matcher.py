@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Image File to Product Matcher
+Proposes product_image paths for catalog products that have none, by
+joining image file names to product names in one pass.
+
+File names and product names go through the same engine
+(text_normalization.name_key), after file-name noise is dropped ("copy",
+"packet", "(2)"). MBL-xxx files in MBL/images are matched under the name of
+the MBL product they belong to. Candidates are blocked by the first
+characters of the key and of each word, so only pairs sharing a block are
+scored:
+  - character similarity of the two keys, blended with
+  - the share of name words found (fuzzily) in the other name
+  - a penalty when either name has a word the other lacks, so a variant
+    ("Cardion Super 50 WP") falls below MIN_CONFIDENCE for the base
+    product's image ("Cardion_50WP") and is not proposed at all
+  - bonus/penalty when both carry concentrations that agree/disagree, and a
+    penalty when both carry formulation codes (EC, WP...) that disagree
+
+Files with the same key in several folders count once, from the folder
+listed first, so the margin to the runner-up compares different names.
+
+Each unmatched product gets its best image with a confidence and runner-ups,
+written to image_match_report.json; all image paths in it are relative to
+the catalog they are proposed for. Scores are memoized per name pair, so
+names repeated across catalogs are matched once. With --apply, proposals at
+or above AUTO_APPLY_CONFIDENCE are written into the catalogs.
+
+Usage:
+    python image_matcher.py [catalog.json ...] [--apply]
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from resize_engine import find_images
+from text_normalization import FORMULATION_CODES, clean_for_variant_check, name_key, normalize_text
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Image folders (relative to the repository root) in order of preference
+DEFAULT_IMAGE_FOLDERS = (
+    'imported_products/images',
+    'FinalProjectandData/images',
+    'imported_products/main',
+    'MBL/images',
+)
+DEFAULT_CATALOGS = ('kb_english_products.json', 'kb_filtered_products.json', 'kb_converted_products.json')
+MBL_CATALOG = os.path.join(REPO_ROOT, 'MBL', 'data', 'products_data.json')
+
+MATCH_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+
+# Characters of the key / of each word used as blocking keys
+BLOCK_PREFIX = 3
+
+# Proposals below this confidence are not reported; from AUTO_APPLY_CONFIDENCE on, --apply writes them
+MIN_CONFIDENCE = 0.65
+AUTO_APPLY_CONFIDENCE = 0.85
+
+# Weight of the word overlap against the character similarity
+WORD_WEIGHT = 0.3
+# Words at least this similar count as the same word ("cyperfos" / "cyperphos")
+WORD_SIMILARITY = 0.8
+# Either name has a word without a match in the other ("super", "plus", "gold")
+EXTRA_WORD_PENALTY = 0.2
+CONCENTRATION_BONUS = 0.05
+CONCENTRATION_PENALTY = 0.2
+FORMULATION_PENALTY = 0.2
+
+# Words in file names that describe the photo, not the product
+FILENAME_NOISE_WORDS = {'copy', 'new', 'final', 'packet', 'bottle', 'image', 'img'}
+
+_COPY_SUFFIX_RE = re.compile(r'[ _]*\(\d+\)$')
+_MBL_ID_RE = re.compile(r'MBL-\d+', re.IGNORECASE)
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+# A formulation code on its own or glued to its concentration ("wp", "50wp")
+_FORMULATION_RE = re.compile(r'\d*(' + '|'.join(FORMULATION_CODES) + r')')
+
+
+def _file_label(stem):
+    """File stem without copy suffixes and noise words ("Binta Bottle copy" -> "Binta")"""
+    stem = _COPY_SUFFIX_RE.sub('', stem)
+    words = [word for word in stem.replace('_', ' ').split() if word.lower() not in FILENAME_NOISE_WORDS]
+    return ' '.join(words) or stem
+
+
+class MatchKey:
+    """Normalized forms of one name used for blocking and scoring"""
+
+    __slots__ = ('key', 'words', 'numbers', 'formulations')
+
+    def __init__(self, name):
+        self.key = name_key(name)
+        self.words = tuple(word for word in clean_for_variant_check(name.replace('_', ' ')).split()
+                           if not word.isdigit())
+        # "1.8" survives normalize_text as "1 8", so numbers come from the raw name
+        self.numbers = frozenset(_NUMBER_RE.findall(name))
+        self.formulations = frozenset(match.group(1) for match in map(
+            _FORMULATION_RE.fullmatch, normalize_text(name.replace('_', ' ')).split()) if match)
+
+    def blocks(self):
+        blocks = {'k:' + self.key[:BLOCK_PREFIX]}
+        # The brand (first word) alone, so "Binta" still meets "Binta 2 EC"
+        if self.words and len(self.words[0]) >= BLOCK_PREFIX:
+            blocks.add('w:' + self.words[0][:BLOCK_PREFIX])
+        return blocks
+
+
+@lru_cache(maxsize=None)
+def _similar_words(word, other):
+    return word == other or SequenceMatcher(None, word, other).ratio() >= WORD_SIMILARITY
+
+
+def _word_overlap(words, other_words):
+    """Share of the words of the longer name that have a close match in the other"""
+    if not words or not other_words:
+        return 0.0
+    matched = sum(any(_similar_words(word, other) for other in other_words) for word in words)
+    return matched / max(len(words), len(other_words))
+
+
+def match_score(product, image):
+    """
+    Confidence (0-1) that image shows product.
+
+    Args:
+        product, image (MatchKey): Normalized names
+    """
+    overlap = _word_overlap(product.words, image.words)
+    score = (1 - WORD_WEIGHT) * SequenceMatcher(None, product.key, image.key).ratio() + WORD_WEIGHT * overlap
+    if overlap < 1:
+        score -= EXTRA_WORD_PENALTY
+    if product.numbers and image.numbers:
+        score += CONCENTRATION_BONUS if product.numbers & image.numbers else -CONCENTRATION_PENALTY
+    if product.formulations and image.formulations and not product.formulations & image.formulations:
+        score -= FORMULATION_PENALTY
+    return round(max(0.0, min(1.0, score)), 3)
+
+
+def mbl_image_names(catalog_path=MBL_CATALOG):
+    """MBL product_id -> product_name, for MBL-xxx image files"""
+    if not os.path.exists(catalog_path):
+        return {}
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        return {p['product_id'].upper(): p['product_name'] for p in json.load(f) if p.get('product_name')}
+
+
+class ImageCatalog:
+    """Image files keyed and blocked for matching"""
+
+    def __init__(self, folders=DEFAULT_IMAGE_FOLDERS, aliases=None):
+        """
+        Args:
+            folders (list): Image folders, most preferred first
+            aliases (dict): Upper-case file id (e.g. MBL-019) -> product name it stands for
+        """
+        aliases = aliases or {}
+        # (path, folder rank, MatchKey)
+        self.images = []
+        self.blocks = defaultdict(list)
+        # product name -> ranked candidates
+        self._candidates = {}
+        for rank, folder in enumerate(folders):
+            folder = os.path.join(REPO_ROOT, folder)
+            if not os.path.isdir(folder):
+                continue
+            for path in sorted(find_images(folder, MATCH_EXTENSIONS, recursive=False)):
+                label = _file_label(os.path.splitext(os.path.basename(path))[0])
+                if _MBL_ID_RE.fullmatch(label):
+                    if label.upper() not in aliases:
+                        continue
+                    label = aliases[label.upper()]
+                key = MatchKey(label)
+                if not key.key:
+                    continue
+                position = len(self.images)
+                self.images.append((path, rank, key))
+                for block in key.blocks():
+                    self.blocks[block].append(position)
+
+    def candidates(self, name, limit=3):
+        """
+        Best images for a product name.
+
+        Returns:
+            list: (path, confidence) pairs, best first
+        """
+        if name not in self._candidates:
+            self._candidates[name] = self._rank(MatchKey(name))
+        return self._candidates[name][:limit]
+
+    def _rank(self, product):
+        if not product.key:
+            return []
+        positions = set()
+        for block in product.blocks():
+            positions.update(self.blocks.get(block, ()))
+
+        # One candidate per image key: the copy in the most preferred folder
+        best = {}
+        for position in positions:
+            path, rank, image = self.images[position]
+            score = match_score(product, image)
+            if score >= MIN_CONFIDENCE and (image.key not in best or rank < best[image.key][1]):
+                best[image.key] = (-score, rank, path)
+        return [(path, -negative_score) for negative_score, _, path in sorted(best.values())]
+
+
+def _has_image(product, catalog_dir):
+    image = product.get('product_image')
+    return bool(image) and os.path.exists(os.path.join(catalog_dir, image))
+
+
+def propose_images(products, catalog_dir, images):
+    """
+    Proposals for every product of a catalog without a usable product_image.
+    Image paths, the proposal's and the alternatives', are relative to catalog_dir.
+
+    Returns:
+        tuple: (proposals, names without any candidate)
+    """
+    proposals = []
+    unmatched = []
+    for product in products:
+        if _has_image(product, catalog_dir):
+            continue
+        candidates = images.candidates(product.get('product_name', ''))
+        if not candidates:
+            unmatched.append(product.get('product_name', ''))
+            continue
+        (path, confidence), alternatives = candidates[0], candidates[1:]
+        proposals.append({
+            'product_id': product.get('product_id'),
+            'product_name': product.get('product_name'),
+            'product_image': os.path.relpath(path, catalog_dir).replace(os.sep, '/'),
+            'confidence': confidence,
+            # How far ahead of the runner-up; a small margin needs a human look
+            'margin': round(confidence - alternatives[0][1], 3) if alternatives else confidence,
+            'alternatives': [
+                {'image': os.path.relpath(alt_path, catalog_dir).replace(os.sep, '/'), 'confidence': alt_confidence}
+                for alt_path, alt_confidence in alternatives
+            ],
+        })
+    return proposals, unmatched
+
+
+def apply_proposals(catalog_path, products, proposals, min_confidence=AUTO_APPLY_CONFIDENCE):
+    """Write confident proposals into the catalog; returns how many were applied"""
+    by_id = {p['product_id']: p for p in proposals if p['confidence'] >= min_confidence}
+    applied = 0
+    for product in products:
+        proposal = by_id.get(product.get('product_id'))
+        if proposal:
+            product['product_image'] = proposal['product_image']
+            applied += 1
+    if applied:
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(products, f, indent=2, ensure_ascii=False)
+    return applied
+
+
+def main():
+    args = sys.argv[1:]
+    apply = '--apply' in args
+    catalogs = [arg for arg in args if arg != '--apply'] or [c for c in DEFAULT_CATALOGS if os.path.exists(c)]
+
+    start = time.perf_counter()
+    images = ImageCatalog(aliases=mbl_image_names())
+    report = {'catalogs': {}}
+    total_proposals = 0
+
+    print("=== IMAGE TO PRODUCT MATCHING ===")
+    print(f"Image files indexed: {len(images.images)} ({len(images.blocks)} blocks)")
+    for catalog_path in catalogs:
+        with open(catalog_path, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        catalog_dir = os.path.dirname(os.path.abspath(catalog_path))
+        proposals, unmatched = propose_images(products, catalog_dir, images)
+        confident = sum(p['confidence'] >= AUTO_APPLY_CONFIDENCE for p in proposals)
+        total_proposals += len(proposals)
+
+        print(f"\n{catalog_path}: {len(products)} products, {len(proposals) + len(unmatched)} without image")
+        print(f"  Proposed: {len(proposals)} ({confident} at confidence >= {AUTO_APPLY_CONFIDENCE})")
+        print(f"  No candidate: {len(unmatched)}")
+        for proposal in sorted(proposals, key=lambda p: p['confidence'])[:5]:
+            print(f"  ? {proposal['product_name']} -> {proposal['product_image']} ({proposal['confidence']})")
+
+        entry = {'products': len(products), 'proposals': proposals, 'unmatched': unmatched}
+        if apply:
+            entry['applied'] = apply_proposals(catalog_path, products, proposals)
+            print(f"  Applied: {entry['applied']}")
+        report['catalogs'][catalog_path] = entry
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"\nTime: {elapsed_ms:.1f} ms for {total_proposals} proposals")
+    with open('image_match_report.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Report saved to: image_match_report.json")
+
+
+if __name__ == "__main__":
+    main()
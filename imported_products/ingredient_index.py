@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Active-Ingredient Index
+Parses the free-text medicine_name of each product into normalized active
+ingredients with concentrations, takes the formulation code from the
+product name, and indexes ingredient -> products. Substitute lookups
+("other products with the same actives as Gain 20 SL") and containment
+lookups ("all products containing Emamectin") are dictionary hits.
+
+Usage:
+    python ingredient_index.py "Gain 20 SL"
+    python ingredient_index.py --ingredient Emamectin
+"""
+
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+from text_normalization import FORMULATION_CODES, name_key
+
+# Salt, ester and hydrate words that do not change which active it is
+# ("Emamectin Benzoate" -> emamectin, "Quizalofop-p-ethyl" -> quizalofop)
+SALT_WORDS = frozenset([
+    'amine', 'ammonium', 'benzoate', 'butyl', 'ethy', 'ethyl', 'hydrate',
+    'hydrochloride', 'methyl', 'p', 'salt', 'sodium',
+])
+
+# Spellings seen in the catalog mapped to one canonical name
+INGREDIENT_ALIASES = {
+    'carbedazim': 'carbendazim',
+    'chlorpyriphos': 'chlorpyrifos',
+    'fenvelarate': 'fenvalerate',
+    'iprodion': 'iprodione',
+    'kasuga': 'kasugamycin',
+    'profenoso': 'profenofos',
+    'propergite': 'propargite',
+    'propiconazol': 'propiconazole',
+    'pymetrozin': 'pymetrozine',
+    'pyrazosulfuran': 'pyrazosulfuron',
+}
+
+_PARENTHESES_RE = re.compile(r'\([^)]*\)')
+_CONCENTRATION_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+_CODE_RE = re.compile(r'\b(' + '|'.join(FORMULATION_CODES) + r')\b', re.IGNORECASE)
+_PRODUCT_FORMULATION_RE = re.compile(
+    r'(\d+(?:\.\d+)?)?\s*(' + '|'.join(FORMULATION_CODES) + r')\b', re.IGNORECASE
+)
+_NAME_WORD_RE = re.compile(r'[a-z0-9]+(?:,[0-9]+)?(?:-[a-z0-9]+)*')
+
+
+def normalize_ingredient(name):
+    """Canonical key for an active ingredient name"""
+    text = name.lower().replace('- ', '-').replace(' -', '-')
+    words = []
+    for word in _NAME_WORD_RE.findall(text):
+        # Split hyphenated words except chemical prefixes like "2,4-d"
+        words.extend([word] if re.match(r'^\d', word) else word.split('-'))
+    while len(words) > 1 and words[-1] in SALT_WORDS:
+        words.pop()
+    words = [INGREDIENT_ALIASES.get(word, word) for word in words]
+    return ' '.join(words)
+
+
+def parse_medicine_name(medicine_name):
+    """
+    Split a medicine_name into active ingredients.
+
+    Returns:
+        list: dicts with 'name' (as written), 'key' (normalized),
+              'concentration' (percent as float or None) and 'formulation' (or None)
+    """
+    if not medicine_name:
+        return []
+
+    ingredients = []
+    for part in medicine_name.split('+'):
+        part = _PARENTHESES_RE.sub(' ', part)
+        # "Magnesium Sulphate/MgSO4": keep the spelled-out name
+        part = part.split('/')[0]
+
+        concentration = None
+        match = _CONCENTRATION_RE.search(part)
+        if match:
+            concentration = float(match.group(1))
+            part = part[:match.start()] + ' ' + part[match.end():]
+
+        formulation = None
+        code = _CODE_RE.search(part)
+        if code:
+            formulation = code.group(1).upper()
+            part = part[:code.start()] + ' ' + part[code.end():]
+
+        name = ' '.join(part.split())
+        key = normalize_ingredient(name)
+        if key:
+            ingredients.append({
+                'name': name,
+                'key': key,
+                'concentration': concentration,
+                'formulation': formulation,
+            })
+    return ingredients
+
+
+def parse_formulation(product_name):
+    """Concentration and formulation code from a product name ("Gain 20 SL" -> ('20', 'SL'))"""
+    matches = _PRODUCT_FORMULATION_RE.findall(product_name or '')
+    if not matches:
+        return None, None
+    concentration, code = matches[-1]
+    return concentration or None, code.upper()
+
+
+class IngredientIndex:
+    def __init__(self):
+        self.products = {}
+        self.parsed = {}
+        self.ingredient_names = {}
+        self.ingredient_products = defaultdict(set)
+        # Sorted tuple of ingredient keys -> products with exactly those actives
+        self.combination_products = defaultdict(set)
+        self.name_to_ids = defaultdict(set)
+
+    def build(self, products):
+        for product in products:
+            product_id = product.get('product_id')
+            if not product_id:
+                continue
+            medicine_name = product.get('medicine_name') or product.get('common_name', '')
+            ingredients = parse_medicine_name(medicine_name)
+            concentration, formulation = parse_formulation(product.get('product_name', ''))
+
+            self.products[product_id] = product
+            self.parsed[product_id] = {
+                'ingredients': ingredients,
+                'concentration': concentration,
+                'formulation': formulation,
+            }
+            self.name_to_ids[name_key(product.get('product_name', ''))].add(product_id)
+
+            keys = tuple(sorted({ingredient['key'] for ingredient in ingredients}))
+            if keys:
+                self.combination_products[keys].add(product_id)
+            for ingredient in ingredients:
+                self.ingredient_products[ingredient['key']].add(product_id)
+                self.ingredient_names.setdefault(ingredient['key'], ingredient['name'])
+        return self
+
+    def _resolve(self, product):
+        """Accept a product_id or a product name"""
+        if product in self.products:
+            return {product}
+        return self.name_to_ids.get(name_key(product), set())
+
+    def products_containing(self, ingredient):
+        """Product ids containing an active ingredient (alone or in a combination)"""
+        return sorted(self.ingredient_products.get(normalize_ingredient(ingredient), ()))
+
+    def ingredients_of(self, product):
+        keys = set()
+        for product_id in self._resolve(product):
+            keys.update(ingredient['key'] for ingredient in self.parsed[product_id]['ingredients'])
+        return tuple(sorted(keys))
+
+    def substitutes(self, product):
+        """
+        Products with exactly the same active ingredients.
+
+        Returns:
+            list: product ids, same-formulation products first
+        """
+        own_ids = self._resolve(product)
+        if not own_ids:
+            return []
+        own_formulations = {self.parsed[product_id]['formulation'] for product_id in own_ids}
+        candidates = set()
+        for product_id in own_ids:
+            keys = tuple(sorted({i['key'] for i in self.parsed[product_id]['ingredients']}))
+            candidates |= self.combination_products.get(keys, set())
+        # The same product listed by another source is not a substitute
+        own_names = {name_key(self.products[product_id].get('product_name', '')) for product_id in own_ids}
+        candidates = {c for c in candidates if name_key(self.products[c].get('product_name', '')) not in own_names}
+        return sorted(
+            candidates,
+            key=lambda c: (self.parsed[c]['formulation'] not in own_formulations, c),
+        )
+
+
+def main():
+    products = []
+    for path in ['products_data.json', 'kb_english_products.json']:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                products.extend(json.load(f))
+
+    index = IngredientIndex().build(products)
+    print(f"Indexed {len(index.products)} products, {len(index.ingredient_products)} active ingredients, "
+          f"{len(index.combination_products)} distinct combinations")
+
+    if len(sys.argv) > 2 and sys.argv[1] == '--ingredient':
+        ingredient = ' '.join(sys.argv[2:])
+        print(f"\n=== PRODUCTS CONTAINING '{ingredient}' ===")
+        for product_id in index.products_containing(ingredient):
+            product = index.products[product_id]
+            print(f"  {product_id} - {product['product_name']} ({product.get('medicine_name', '')})")
+        return
+
+    name = ' '.join(sys.argv[1:]) or 'Gain 20 SL'
+    print(f"\n=== SUBSTITUTES FOR '{name}' ===")
+    print(f"Active ingredients: {', '.join(index.ingredients_of(name)) or 'unknown'}")
+    for product_id in index.substitutes(name):
+        product = index.products[product_id]
+        formulation = index.parsed[product_id]['formulation'] or '?'
+        print(f"  {product_id} - {product['product_name']} [{formulation}] ({product.get('medicine_name', '')})")
+
+
+if __name__ == "__main__":
+    main()
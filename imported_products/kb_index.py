@@ -0,0 +1,265 @@
+"""
+KB Inverted Index
+Prebuilt forward and reverse lookups over the nested crop -> pest -> products
+structure of kb.json:
+
+    crop -> pests, pest -> crops, (crop, pest) -> products,
+    product -> (crop, pest) pairs, ingredient -> products
+
+The index is serialized to kb_index.json for instant loading. When kb.json
+changes only the crops whose section actually changed are re-indexed.
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+
+from ingredient_index import normalize_ingredient, parse_medicine_name
+from text_normalization import normalize_text
+
+INDEX_VERSION = 2
+
+
+def _section_hash(crop_data):
+    """Stable content hash of one crop's section of kb.json"""
+    payload = json.dumps(crop_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _source_stamp(kb_path):
+    stat = os.stat(kb_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def split_ingredients(medicine_name):
+    """Normalized keys of the active ingredients in a medicine_name"""
+    return [ingredient['key'] for ingredient in parse_medicine_name(medicine_name)]
+
+
+class KBIndex:
+    def __init__(self):
+        # Per-crop source of truth: crop -> {'hash': ..., 'entries': [[pest, [[product, medicine], ...]], ...]}
+        self.crops = {}
+        self.source_stamp = None
+
+        # Display names keyed by normalized form
+        self.names = {}
+
+        # Inverted maps, all keyed by normalized names
+        self.crop_pests = defaultdict(set)
+        self.pest_crops = defaultdict(set)
+        self.pair_products = defaultdict(set)
+        self.product_pairs = defaultdict(set)
+        self.ingredient_products = defaultdict(set)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _key(self, name):
+        key = normalize_text(name)
+        if key and key not in self.names:
+            self.names[key] = ' '.join(name.split())
+        return key
+
+    def _add_crop(self, crop_name, entries):
+        crop = self._key(crop_name)
+        for pest_name, products in entries:
+            pest = self._key(pest_name)
+            self.crop_pests[crop].add(pest)
+            self.pest_crops[pest].add(crop)
+            pair = f"{crop}|{pest}"
+            for product_name, medicine_name in products:
+                product = self._key(product_name)
+                if not product:
+                    continue
+                self.pair_products[pair].add(product)
+                self.product_pairs[product].add(pair)
+                for ingredient in split_ingredients(medicine_name):
+                    self.ingredient_products[ingredient].add(product)
+
+    def _ingredient_links(self, entries):
+        links = set()
+        for _, products in entries:
+            for product_name, medicine_name in products:
+                product = normalize_text(product_name)
+                if product:
+                    for ingredient in split_ingredients(medicine_name):
+                        links.add((ingredient, product))
+        return links
+
+    def _remove_crop(self, crop_name, entries):
+        crop = normalize_text(crop_name)
+        for pest_name, products in entries:
+            pest = normalize_text(pest_name)
+            pair = f"{crop}|{pest}"
+            self.pest_crops[pest].discard(crop)
+            for product_name, _ in products:
+                self.product_pairs[normalize_text(product_name)].discard(pair)
+            self.pair_products.pop(pair, None)
+        self.crop_pests.pop(crop, None)
+
+        # Ingredient postings are shared between crops; only drop the links
+        # that no remaining crop still contributes
+        removed_links = self._ingredient_links(entries)
+        for section in self.crops.values():
+            removed_links -= self._ingredient_links(section['entries'])
+        for ingredient, product in removed_links:
+            self.ingredient_products[ingredient].discard(product)
+
+        for mapping in (self.pest_crops, self.product_pairs, self.ingredient_products):
+            for key in [k for k, v in mapping.items() if not v]:
+                del mapping[key]
+
+    @staticmethod
+    def _extract_entries(crop_data):
+        entries = []
+        if not isinstance(crop_data, list):
+            return entries
+        for pest_entry in crop_data:
+            products = [
+                [product.get('product_name', ''), product.get('medicine_name', '')]
+                for product in pest_entry.get('products', [])
+            ]
+            entries.append([pest_entry.get('pest', ''), products])
+        return entries
+
+    def update_from_kb(self, kb_data):
+        """Re-index only the crops whose kb.json section changed. Returns the changed crop names."""
+        changed = []
+
+        for crop_name in [c for c in self.crops if c not in kb_data]:
+            self._remove_crop(crop_name, self.crops.pop(crop_name)['entries'])
+            changed.append(crop_name)
+
+        for crop_name, crop_data in kb_data.items():
+            section_hash = _section_hash(crop_data)
+            previous = self.crops.get(crop_name)
+            if previous and previous['hash'] == section_hash:
+                continue
+            if previous:
+                self._remove_crop(crop_name, self.crops.pop(crop_name)['entries'])
+            entries = self._extract_entries(crop_data)
+            self.crops[crop_name] = {'hash': section_hash, 'entries': entries}
+            self._add_crop(crop_name, entries)
+            changed.append(crop_name)
+
+        return changed
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _display(self, keys):
+        return sorted(self.names.get(key, key) for key in keys)
+
+    def pests_for_crop(self, crop):
+        return self._display(self.crop_pests.get(normalize_text(crop), ()))
+
+    def crops_for_pest(self, pest):
+        return self._display(self.pest_crops.get(normalize_text(pest), ()))
+
+    def products_for(self, crop, pest):
+        """Products that treat pest X on crop Y"""
+        pair = f"{normalize_text(crop)}|{normalize_text(pest)}"
+        return self._display(self.pair_products.get(pair, ()))
+
+    def uses_of_product(self, product_name):
+        """(crop, pest) pairs a product is recommended for"""
+        pairs = []
+        for pair in self.product_pairs.get(normalize_text(product_name), ()):
+            crop, pest = pair.split('|', 1)
+            pairs.append((self.names.get(crop, crop), self.names.get(pest, pest)))
+        return sorted(pairs)
+
+    def products_with_ingredient(self, ingredient):
+        return self._display(self.ingredient_products.get(normalize_ingredient(ingredient), ()))
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def to_dict(self):
+        def dump(mapping):
+            return {key: sorted(values) for key, values in mapping.items()}
+
+        return {
+            'version': INDEX_VERSION,
+            'source_stamp': self.source_stamp,
+            'crops': self.crops,
+            'names': self.names,
+            'crop_pests': dump(self.crop_pests),
+            'pest_crops': dump(self.pest_crops),
+            'pair_products': dump(self.pair_products),
+            'product_pairs': dump(self.product_pairs),
+            'ingredient_products': dump(self.ingredient_products),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        index.source_stamp = data.get('source_stamp')
+        index.crops = data['crops']
+        index.names = data['names']
+        for attr in ('crop_pests', 'pest_crops', 'pair_products', 'product_pairs', 'ingredient_products'):
+            mapping = getattr(index, attr)
+            for key, values in data[attr].items():
+                mapping[key] = set(values)
+        return index
+
+    def save(self, index_path):
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_kb_index(kb_path='kb.json', index_path='kb_index.json'):
+    """
+    Load the serialized index, rebuilding it incrementally if kb.json changed.
+
+    Returns:
+        tuple: (KBIndex, list of crop names that were re-indexed)
+    """
+    index = None
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                index = KBIndex.from_dict(data)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable index {index_path}: {e}")
+
+    stamp = _source_stamp(kb_path)
+    if index is not None and index.source_stamp == stamp:
+        return index, []
+
+    if index is None:
+        index = KBIndex()
+
+    with open(kb_path, 'r', encoding='utf-8') as f:
+        kb_data = json.load(f)
+
+    changed = index.update_from_kb(kb_data)
+    index.source_stamp = stamp
+    index.save(index_path)
+    return index, changed
+
+
+def main():
+    index, changed = load_kb_index()
+
+    print(f"=== KB INDEX ===")
+    print(f"Crops: {len(index.crop_pests)}")
+    print(f"Pests: {len(index.pest_crops)}")
+    print(f"Crop/pest pairs: {len(index.pair_products)}")
+    print(f"Products: {len(index.product_pairs)}")
+    print(f"Active ingredients: {len(index.ingredient_products)}")
+    if changed:
+        print(f"Re-indexed {len(changed)} crops: {', '.join(changed)}")
+    else:
+        print("Index is up to date with kb.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Versioned Query-Result Cache
+Bounded LRU cache in front of the catalog lookup/search layer.
+
+Results are keyed on (namespace, normalized query, extra positional and
+keyword arguments) and tied to a catalog version stamp. Any write to the catalog changes the stamp, and
+the next access drops every cached result, so a stale answer is never
+served. Results are stored frozen (lists become tuples, dicts read-only
+mappings) and that frozen value is what every caller gets, so no caller can
+corrupt a later hit. Hit-ratio metrics show how often the index is
+actually touched.
+
+Usage:
+    python query_cache.py
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+from text_normalization import normalize_text
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class CatalogVersion:
+    """Monotonic version stamp; call bump() after every catalog write"""
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+            return self._version
+
+    def __call__(self):
+        return self._version
+
+
+class FileCatalogVersion:
+    """Version stamp derived from the mtime and size of the catalog files"""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+
+    def __call__(self):
+        stamp = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+
+def freeze(value):
+    """Immutable equivalent of a lookup result (tuples, read-only mappings, frozensets)"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+class QueryCache:
+    def __init__(self, version_source, maxsize=DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            version_source (callable): Returns the current catalog version stamp
+            maxsize (int): Maximum number of cached results
+        """
+        self.version_source = version_source
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._version = version_source()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(namespace, query, *args, **kwargs):
+        return (namespace, normalize_text(query)) + args + tuple(sorted(kwargs.items()))
+
+    def _check_version(self):
+        version = self.version_source()
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+            self.invalidations += 1
+
+    def get_or_compute(self, namespace, query, compute, *args, **kwargs):
+        """
+        Return the cached result for query, computing and storing it on a miss.
+        The result is frozen (see freeze()), also on a miss.
+
+        Args:
+            namespace (str): Which lookup the result belongs to (e.g. 'search')
+            query (str): Raw query text; normalized for the cache key
+            compute (callable): Called as compute(query, *args, **kwargs) on a miss
+        """
+        key = self.make_key(namespace, query, *args, **kwargs)
+        with self._lock:
+            self._check_version()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            version = self._version
+
+        result = freeze(compute(query, *args, **kwargs))
+
+        with self._lock:
+            # Do not store a result computed against a catalog that changed meanwhile
+            if self.version_source() == version:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def wrap(self, namespace, lookup):
+        """Return lookup(query, *args, **kwargs) with results served from this cache"""
+        def cached_lookup(query, *args, **kwargs):
+            return self.get_or_compute(namespace, query, lookup, *args, **kwargs)
+        cached_lookup.__name__ = getattr(lookup, '__name__', namespace)
+        return cached_lookup
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(self.hit_ratio, 4),
+        }
+
+
+def main():
+    from search_engine import BM25Index, load_catalog
+
+    catalog_files = ['kb_english_products.json', 'kb_bengali_products.json', 'products_data.json']
+    index = BM25Index().build(load_catalog(catalog_files))
+    cache = QueryCache(FileCatalogVersion(catalog_files), maxsize=256)
+    search = cache.wrap('search', index.search)
+
+    # Helpline traffic is dominated by a handful of queries
+    queries = ['BPH', 'late blight', 'Rice', 'bph ', 'Late Blight', 'stem borer', 'rice'] * 500
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query)
+    uncached_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    cached_ms = (time.perf_counter() - start) * 1000
+
+    print(f"=== QUERY CACHE ===")
+    print(f"Queries: {len(queries)}")
+    print(f"Uncached: {uncached_ms:.1f} ms")
+    print(f"Cached: {cached_ms:.1f} ms")
+    for name, value in cache.stats().items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
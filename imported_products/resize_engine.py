@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Parallel Image Resize Engine
+Resizes batches of images on a process pool instead of one core.
+
+Jobs are handed to the workers in chunks so the per-task IPC cost is paid
+once per chunk, and each worker receives the resize settings once in its
+initializer (Pillow plugins are loaded there too). Progress and
+throughput (images/s, MB/s) are printed while the pool runs.
+
+JPEG sources are decoded in draft mode at the smallest DCT scale (1/2, 1/4,
+1/8) that is still at least the target size, and any remaining large factor
+is taken off with reduce() before the final LANCZOS resample, so a camera
+JPEG is never fully decoded just to be thrown away.
+
+With a memory limit, each image's decoded size is estimated from its header
+before decoding, large images are reduced in horizontal strips (so no
+full-size RGB copy is made), and workers reserve their estimate from one
+byte budget shared by the pool before touching pixels. An image whose
+estimate exceeds the whole budget, or (with max_pixels) whose header
+reports more pixels than allowed, is rejected before any pixel is decoded
+and reported as skipped.
+
+With trimming, the white field around the product is cropped off (keeping
+a margin and the output aspect ratio) after decoding and before the final
+resample (see auto_trim.py).
+
+With a budget (WebP/AVIF output), the encoder quality is chosen per image to
+fit a byte budget or SSIM floor (see budget_encoder.py).
+
+With a manifest path, only new or changed sources are rebuilt and outputs
+whose source file was deleted are removed (see build_manifest.py).
+
+Used by resize_images.py and "zMBL Product Images/process_images.py".
+"""
+
+import glob
+import math
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import contextmanager
+from multiprocessing import Pool, cpu_count
+
+from PIL import Image
+
+from auto_trim import trim
+from budget_encoder import encode_to_budget
+from build_manifest import BuildManifest
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif')
+
+# Chunks handed to each worker over the whole run; more chunks balance uneven images better
+CHUNKS_PER_WORKER = 4
+
+# reduce() only down to this multiple of the target so LANCZOS still has detail to work with
+REDUCING_GAP = 2
+
+# Source rows converted and reduced at a time in memory-limited mode
+STRIP_HEIGHT = 256
+
+# Per-worker state set by _init_worker
+_settings = {}
+_memory_budget = None
+
+
+class ImageRejected(Exception):
+    """Source refused from its header (too many pixels, or larger than the memory budget)"""
+
+
+class MemoryBudget:
+    """Byte budget shared by pool workers: a counting semaphore over bytes"""
+
+    def __init__(self, limit_bytes):
+        self.limit = limit_bytes
+        self._available = multiprocessing.Value('q', limit_bytes, lock=False)
+        self._condition = multiprocessing.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes):
+        if nbytes > self.limit:
+            raise ImageRejected(f"needs ~{nbytes / 1e6:.0f} MB, more than the {self.limit / 1e6:.0f} MB budget")
+        with self._condition:
+            while self._available.value < nbytes:
+                self._condition.wait()
+            self._available.value -= nbytes
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._available.value += nbytes
+                self._condition.notify_all()
+
+
+def find_images(folder, extensions=IMAGE_EXTENSIONS, recursive=True):
+    """Sorted, de-duplicated image paths under folder"""
+    pattern = os.path.join(folder, '**', '*') if recursive else os.path.join(folder, '*')
+    return sorted(
+        path for path in glob.glob(pattern, recursive=recursive)
+        if os.path.isfile(path) and path.lower().endswith(tuple(extensions))
+    )
+
+
+def _init_worker(settings, memory_budget=None):
+    global _memory_budget
+    Image.init()
+    _settings.clear()
+    _settings.update(settings)
+    _memory_budget = memory_budget
+
+
+def to_rgb(img, background):
+    """Convert to RGB, compositing transparent images onto background when given"""
+    if background is not None and img.mode in ('RGBA', 'LA', 'P'):
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        flattened = Image.new('RGB', img.size, background)
+        flattened.paste(img, mask=img.getchannel('A'))
+        return flattened
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def decode_for_size(img, size):
+    """
+    Decode img no larger than needed for a resize to size.
+
+    Args:
+        img (PIL.Image.Image): Freshly opened (not yet loaded) image
+        size (tuple): Final (width, height)
+
+    Returns:
+        PIL.Image.Image: Loaded image, at least size in both dimensions when the source was
+    """
+    if img.format == 'JPEG':
+        # Keep the mode, only pick the DCT scale; colour conversion happens later
+        img.draft(img.mode, size)
+    factor = min(img.width // (size[0] * REDUCING_GAP), img.height // (size[1] * REDUCING_GAP))
+    if factor >= 2:
+        return img.reduce(factor)
+    img.load()
+    return img
+
+
+def _draft_scale(img, size):
+    """DCT scale (1, 2, 4 or 8) JPEG draft mode will decode img at for size"""
+    if img.format != 'JPEG':
+        return 1
+    scale = min(img.width // size[0], img.height // size[1])
+    # A source smaller than the target in either dimension gives 0: decode at full size
+    return next((s for s in (8, 4, 2, 1) if scale >= s), 1)
+
+
+def estimate_memory(img, size):
+    """Peak bytes to decode and resize img to size, from the header only"""
+    scale = _draft_scale(img, size)
+    width, height = math.ceil(img.width / scale), math.ceil(img.height / scale)
+    bytes_per_pixel = 1 if img.mode in ('1', 'L', 'P') else 4
+    # Decoded source, one strip being converted, and the output
+    return (width * height * bytes_per_pixel
+            + width * min(height, STRIP_HEIGHT) * 8
+            + size[0] * size[1] * 4 * 2)
+
+
+def reduce_in_strips(img, size, background):
+    """
+    Decode img (JPEG at draft scale) and reduce it to RGB strip by strip.
+
+    Returns:
+        PIL.Image.Image: RGB image, at least size in both dimensions when the source was
+    """
+    if img.format == 'JPEG':
+        img.draft(img.mode, size)
+    img.load()
+    factor = max(1, min(img.width // (size[0] * REDUCING_GAP), img.height // (size[1] * REDUCING_GAP)))
+    if factor == 1:
+        return to_rgb(img, background)
+
+    reduced = Image.new('RGB', (img.width // factor, img.height // factor))
+    rows = max(factor, STRIP_HEIGHT // factor * factor)
+    for top in range(0, reduced.height * factor, rows):
+        bottom = min(top + rows, reduced.height * factor)
+        strip = to_rgb(img.crop((0, top, reduced.width * factor, bottom)), background)
+        reduced.paste(strip.reduce(factor), (0, top // factor))
+    return reduced
+
+
+def resize_file(job):
+    """
+    Resize one image with the worker settings.
+
+    Args:
+        job (tuple): (input_path, output_path)
+
+    Returns:
+        tuple: (input_path, output_path, error or None, bytes read, bytes written,
+                budget encoding details or None, rejection reason or None)
+    """
+    input_path, output_path = job
+    try:
+        with Image.open(input_path) as img:
+            max_pixels = _settings.get('max_pixels')
+            if max_pixels and img.width * img.height > max_pixels:
+                raise ImageRejected(f"{img.width}x{img.height} is more than {max_pixels} pixels")
+            if _memory_budget is not None:
+                with _memory_budget.reserve(estimate_memory(img, _settings['size'])):
+                    img = reduce_in_strips(img, _settings['size'], _settings['background'])
+                    if _settings.get('trim'):
+                        img = trim(img, _settings['size'], **_settings['trim'])
+                    resized_img = img.resize(_settings['size'], Image.Resampling.LANCZOS)
+                    del img
+            else:
+                if _settings.get('fast_decode', True):
+                    img = decode_for_size(img, _settings['size'])
+                img = to_rgb(img, _settings['background'])
+                if _settings.get('trim'):
+                    img = trim(img, _settings['size'], **_settings['trim'])
+                resized_img = img.resize(_settings['size'], Image.Resampling.LANCZOS)
+
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            details = None
+            if _settings.get('budget') is not None:
+                encoded = encode_to_budget(resized_img, _settings['format'], **_settings['budget'])
+                with open(output_path, 'wb') as f:
+                    f.write(encoded.pop('data'))
+                details = encoded
+            else:
+                resized_img.save(output_path, _settings['format'], **_settings['save_options'])
+
+        return (input_path, output_path, None, os.path.getsize(input_path), os.path.getsize(output_path),
+                details, None)
+    except ImageRejected as e:
+        return input_path, output_path, None, 0, 0, None, str(e)
+    except Exception as e:
+        # repr() for exceptions without a message (StopIteration, MemoryError) so the error is never ''
+        return input_path, output_path, str(e) or repr(e), 0, 0, None, None
+
+
+def resize_images(jobs, size=(512, 512), image_format='JPEG', save_options=None,
+                  background=None, workers=None, progress_every=25, manifest_path=None,
+                  fast_decode=True, budget=None, memory_limit_mb=None, max_pixels=None,
+                  trim=None):
+    """
+    Resize (input_path, output_path) jobs in parallel.
+
+    Args:
+        jobs (list): (input_path, output_path) tuples
+        size (tuple): Target size (width, height)
+        image_format (str): Pillow output format
+        save_options (dict): Extra keyword arguments for Image.save
+        background (tuple): RGB colour to flatten transparent images onto,
+                            or None to drop the alpha channel
+        workers (int): Worker processes (defaults to the CPU count)
+        progress_every (int): Print a progress line every this many images
+        manifest_path (str): Build manifest; when given, unchanged images are
+                             skipped, outputs of deleted sources removed and
+                             sources that collide on one output built only once
+        fast_decode (bool): Use JPEG draft mode and reduce() before the final resample
+        budget (dict): max_bytes and/or min_ssim for WEBP/AVIF output; the quality
+                       is then searched per image and save_options are ignored
+        memory_limit_mb (int): RAM cap shared by all workers for decoded image data;
+                               images estimated above it are rejected
+        max_pixels (int): Reject sources whose header reports more pixels than this
+                          (decompression bombs); rejected images are not decoded
+        trim (dict): threshold and margin to crop the background around the product
+                     before resizing (see auto_trim.trim), or None to keep the whole frame
+
+    Returns:
+        dict: Counts, failures and throughput of the run
+    """
+    jobs = list(jobs)
+    settings = {
+        'size': tuple(size),
+        'format': image_format,
+        'save_options': dict(save_options or {}),
+        'background': background,
+        'fast_decode': fast_decode,
+        'budget': budget,
+        'max_pixels': max_pixels,
+        'trim': trim,
+    }
+    stats = {'total': len(jobs), 'successful': 0, 'failed': [], 'bytes_in': 0, 'bytes_out': 0,
+             'skipped': 0, 'removed': [], 'conflicts': [], 'rejected': [], 'encodings': []}
+    start = time.perf_counter()
+
+    manifest = None
+    if manifest_path:
+        manifest = BuildManifest(manifest_path, settings)
+        stats['removed'] = manifest.prune()
+        jobs, stats['skipped'] = manifest.plan(jobs)
+        stats['conflicts'] = manifest.conflicts
+        stats['total'] = len(jobs)
+
+    workers = max(1, min(workers or cpu_count(), len(jobs) or 1))
+    chunksize = max(1, len(jobs) // (workers * CHUNKS_PER_WORKER))
+    stats['workers'] = workers
+    stats['chunksize'] = chunksize
+
+    if not jobs:
+        if manifest:
+            manifest.save()
+        stats['seconds'] = time.perf_counter() - start
+        return stats
+
+    memory_budget = MemoryBudget(memory_limit_mb * 1024 * 1024) if memory_limit_mb else None
+    with Pool(workers, initializer=_init_worker, initargs=(settings, memory_budget)) as pool:
+        for done, (input_path, output_path, error, bytes_in, bytes_out, details, rejected) in enumerate(
+                pool.imap_unordered(resize_file, jobs, chunksize=chunksize), 1):
+            if rejected:
+                stats['rejected'].append((input_path, rejected))
+                print(f"  - Skipped {input_path}: {rejected}")
+                if manifest:
+                    manifest.forget(output_path)
+            elif error is not None:
+                stats['failed'].append((input_path, error))
+                print(f"  ✗ Failed to process {input_path}: {error}")
+                if manifest:
+                    manifest.forget(output_path)
+            else:
+                stats['successful'] += 1
+                stats['bytes_in'] += bytes_in
+                stats['bytes_out'] += bytes_out
+                if details:
+                    stats['encodings'].append(dict(details, output=output_path, source_bytes=bytes_in))
+                if manifest:
+                    manifest.record(input_path, output_path)
+
+            if done % progress_every == 0 or done == len(jobs):
+                elapsed = time.perf_counter() - start
+                print(f"  [{done}/{len(jobs)}] {done / elapsed:.1f} images/s, "
+                      f"{stats['bytes_in'] / elapsed / 1e6:.1f} MB/s read")
+
+    if manifest:
+        manifest.save()
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def parse_memory_limit(argv):
+    """RAM cap in MB from a --memory-mb N flag, or None"""
+    if '--memory-mb' in argv and argv.index('--memory-mb') + 1 < len(argv):
+        return int(argv[argv.index('--memory-mb') + 1])
+    return None
+
+
+def parse_max_pixels(argv):
+    """Source pixel limit from a --max-pixels N flag, or None"""
+    if '--max-pixels' in argv and argv.index('--max-pixels') + 1 < len(argv):
+        return int(float(argv[argv.index('--max-pixels') + 1]))
+    return None
+
+
+def print_report(stats, output_folder):
+    seconds = stats['seconds'] or 1e-9
+    print(f"\nProcessing complete!")
+    print(f"Successfully processed: {stats['successful']} images")
+    print(f"Failed to process: {len(stats['failed'])} images")
+    if stats['skipped'] or stats['removed']:
+        print(f"Unchanged (skipped): {stats['skipped']} images")
+        print(f"Removed outputs of deleted sources: {len(stats['removed'])}")
+    if stats['rejected']:
+        print(f"Skipped (over the pixel limit or memory budget): {len(stats['rejected'])} images")
+    if stats['conflicts']:
+        print(f"Not built, output already produced by another source: {len(stats['conflicts'])}")
+        for input_path, output_path, owner in stats['conflicts']:
+            print(f"  {input_path} -> {output_path} (built from {owner})")
+    print(f"Workers: {stats['workers']} (chunks of {stats['chunksize']})")
+    print(f"Time: {stats['seconds']:.2f}s ({stats['total'] / seconds:.1f} images/s, "
+          f"{stats['bytes_in'] / seconds / 1e6:.1f} MB/s read)")
+    print(f"Size: {stats['bytes_in'] / 1e6:.1f} MB -> {stats['bytes_out'] / 1e6:.1f} MB")
+    if stats['encodings']:
+        encodings = stats['encodings']
+        print(f"Mean quality: {sum(e['quality'] for e in encodings) / len(encodings):.1f}, "
+              f"mean SSIM: {sum(e['ssim'] for e in encodings) / len(encodings):.4f}, "
+              f"outside budget: {sum(not e['within_budget'] for e in encodings)}")
+    print(f"All resized images saved in: {output_folder}/")
+
+
+def _benchmark_mode(args):
+    """Resize every file in memory in a fresh process; returns (seconds, peak RSS growth in MB, samples)"""
+    import resource
+
+    paths, size, fast_decode = args
+    _init_worker({'size': size, 'background': None, 'fast_decode': fast_decode})
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Keep only a small sample of outputs for the quality comparison
+    samples = []
+    start = time.perf_counter()
+    for path in paths:
+        with Image.open(path) as img:
+            if fast_decode:
+                img = decode_for_size(img, size)
+            resized = to_rgb(img, None).resize(size, Image.Resampling.LANCZOS)
+        if len(samples) < 20:
+            samples.append(resized.tobytes())
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return seconds, (peak - baseline) / 1024, samples
+
+
+def benchmark(folder, size=(512, 512)):
+    """Compare full decode against draft/reduce decode on the images of folder"""
+    paths = find_images(folder)
+    if not paths:
+        print(f"No image files found in {folder}")
+        return
+    jpeg_count = sum(path.lower().endswith(('.jpg', '.jpeg')) for path in paths)
+    print(f"=== RESIZE BENCHMARK ({len(paths)} images, {jpeg_count} JPEG, {folder}) ===")
+
+    results = {}
+    for fast_decode in (False, True):
+        # Fresh process per mode so the peak RSS is not inherited
+        with Pool(1) as pool:
+            results[fast_decode] = pool.apply(_benchmark_mode, ((paths, size, fast_decode),))
+        seconds, peak_mb, _ = results[fast_decode]
+        label = 'Draft + reduce' if fast_decode else 'Full decode'
+        print(f"{label}: {seconds:.2f}s ({len(paths) / seconds:.1f} images/s), peak RSS +{peak_mb:.1f} MB")
+
+    full, fast = results[False], results[True]
+    print(f"Speed-up: {full[0] / fast[0]:.2f}x, peak memory: {full[1]:.1f} MB -> {fast[1]:.1f} MB")
+
+    # Mean absolute difference per channel value between the two outputs (0-255)
+    differences = [
+        sum(abs(a - b) for a, b in zip(full_bytes, fast_bytes)) / len(full_bytes)
+        for full_bytes, fast_bytes in zip(full[2], fast[2])
+    ]
+    print(f"Mean pixel difference on {len(differences)} samples: {sum(differences) / len(differences):.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        benchmark(sys.argv[2] if len(sys.argv) > 2 else os.path.join('..', 'RAW Images'))
+    else:
+        print("Usage: python resize_engine.py --benchmark [folder]")
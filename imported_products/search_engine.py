@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+BM25 Product Search Engine
+In-process full-text search over product and KB text (description, symptoms,
+causes, crops_pests, product_tags) with English and Bengali tokenizers.
+
+BM25 term weights are computed once at build time and stored per posting, so
+a query is just a sum of precomputed impacts over the postings of its terms.
+The index is saved in a compact binary file: a small JSON header followed by
+uint32 document numbers and float32 impacts, loaded straight into NumPy.
+The header records the size and mtime of the catalog files it was built
+from; main() rebuilds the index when they no longer match.
+
+Usage:
+    python search_engine.py "hopperburn"
+    python search_engine.py --benchmark
+"""
+
+import json
+import math
+import os
+import re
+import struct
+import sys
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+
+INDEX_MAGIC = b'MBLBM25\x01'
+
+# Searchable fields and the weight their term frequencies are scaled by
+FIELD_WEIGHTS = {
+    'product_name': 2.0,
+    'medicine_name': 1.5,
+    'description': 1.0,
+    'symptoms': 1.5,
+    'causes': 1.0,
+    'crops_pests': 1.0,
+    'product_tags': 1.0,
+}
+
+ENGLISH_STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with', 'when',
+])
+
+# English words, or Bengali letters together with their vowel signs and virama
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[\u0980-\u09FF]+')
+
+# Common Bengali inflections (plural/case markers) removed from token ends
+BENGALI_SUFFIXES = ('গুলো', 'গুলি', 'দের', 'েরা', 'ের', 'তে', 'টি', 'টা', 'রা', 'কে', 'য়')
+
+
+def _stem_english(token):
+    """
+    Very light suffix stripping so 'yellowing'/'yellow', 'leaves'/'leave' and
+    'diseases'/'disease' meet. Only the final 's' of a plural is removed, so an
+    'e' before it stays, as it does in the singular.
+    """
+    if len(token) > 5 and token.endswith('ing'):
+        return token[:-3]
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def _stem_bengali(token):
+    for suffix in BENGALI_SUFFIXES:
+        if len(token) > len(suffix) + 1 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text):
+    """Tokenize mixed English/Bengali text, dispatching each run to its tokenizer"""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFC', text).lower()
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        if '\u0980' <= token[0] <= '\u09FF':
+            tokens.append(_stem_bengali(token))
+        elif token not in ENGLISH_STOPWORDS:
+            tokens.append(_stem_english(token))
+    return tokens
+
+
+def _field_text(value):
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value)
+    return str(value) if value else ''
+
+
+class BM25Index:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_keys = []
+        self.doc_names = []
+        self.avgdl = 0.0
+        # Catalog signature the index was built from (see catalog_signature)
+        self.source = None
+        self.terms = {}
+        self.postings_docs = np.zeros(0, dtype=np.uint32)
+        self.postings_impacts = np.zeros(0, dtype=np.float32)
+
+    @property
+    def doc_count(self):
+        return len(self.doc_keys)
+
+    def build(self, documents, id_field='product_id', name_field='product_name'):
+        """Build the index from an iterable of product dicts"""
+        doc_terms = []
+        for doc in documents:
+            tf = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(_field_text(doc.get(field))):
+                    tf[token] += weight
+            self.doc_keys.append(str(doc.get(id_field, len(self.doc_keys))))
+            self.doc_names.append(doc.get(name_field, ''))
+            doc_terms.append(tf)
+
+        n = len(doc_terms)
+        lengths = np.array([sum(tf.values()) for tf in doc_terms], dtype=np.float64)
+        self.avgdl = float(lengths.mean()) if n else 0.0
+
+        postings = defaultdict(list)
+        for doc_number, tf in enumerate(doc_terms):
+            for term, freq in tf.items():
+                postings[term].append((doc_number, freq))
+
+        docs_parts = []
+        impact_parts = []
+        offset = 0
+        for term in sorted(postings):
+            entries = postings[term]
+            df = len(entries)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            doc_numbers = np.fromiter((d for d, _ in entries), dtype=np.uint32, count=df)
+            freqs = np.fromiter((f for _, f in entries), dtype=np.float64, count=df)
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc_numbers] / (self.avgdl or 1.0))
+            impacts = idf * freqs * (self.k1 + 1) / (freqs + norm)
+
+            # Keep each posting list sorted by impact so single-term top-k is a slice
+            order = np.argsort(-impacts, kind='stable')
+            docs_parts.append(doc_numbers[order])
+            impact_parts.append(impacts[order].astype(np.float32))
+            self.terms[term] = (offset, df)
+            offset += df
+
+        if docs_parts:
+            self.postings_docs = np.concatenate(docs_parts)
+            self.postings_impacts = np.concatenate(impact_parts)
+        return self
+
+    def search(self, query, top_k=10):
+        """
+        Rank documents for a free-text query.
+
+        Returns:
+            list: (doc_key, doc_name, score) tuples, best first
+        """
+        spans = [self.terms[term] for term in set(tokenize(query)) if term in self.terms]
+        if not spans:
+            return []
+
+        if len(spans) == 1:
+            offset, length = spans[0]
+            end = offset + min(length, top_k)
+            docs = self.postings_docs[offset:end]
+            scores = self.postings_impacts[offset:end]
+        else:
+            doc_numbers = np.concatenate([self.postings_docs[o:o + l] for o, l in spans])
+            impacts = np.concatenate([self.postings_impacts[o:o + l] for o, l in spans])
+            totals = np.bincount(doc_numbers, weights=impacts, minlength=self.doc_count)
+            k = min(top_k, self.doc_count)
+            if k < self.doc_count:
+                docs = np.argpartition(-totals, k)[:k]
+            else:
+                docs = np.arange(self.doc_count)
+            docs = docs[totals[docs] > 0]
+            scores = totals[docs]
+            order = np.argsort(-scores, kind='stable')
+            docs, scores = docs[order], scores[order]
+
+        return [
+            (self.doc_keys[d], self.doc_names[d], float(s))
+            for d, s in zip(docs.tolist(), scores.tolist())
+        ]
+
+    def save(self, index_path):
+        """Write the index as <magic><header length><JSON header><doc numbers><impacts>"""
+        header = json.dumps({
+            'k1': self.k1,
+            'b': self.b,
+            'avgdl': self.avgdl,
+            'source': self.source,
+            'doc_keys': self.doc_keys,
+            'doc_names': self.doc_names,
+            'terms': self.terms,
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        with open(index_path, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(self.postings_docs.astype('<u4').tobytes())
+            f.write(self.postings_impacts.astype('<f4').tobytes())
+
+    @classmethod
+    def load(cls, index_path):
+        with open(index_path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(INDEX_MAGIC):
+            raise ValueError(f"{index_path} is not a BM25 index file")
+
+        pos = len(INDEX_MAGIC)
+        (header_length,) = struct.unpack_from('<I', data, pos)
+        pos += 4
+        header = json.loads(data[pos:pos + header_length].decode('utf-8'))
+        pos += header_length
+
+        index = cls(k1=header['k1'], b=header['b'])
+        index.avgdl = header['avgdl']
+        index.source = header.get('source')
+        index.doc_keys = header['doc_keys']
+        index.doc_names = header['doc_names']
+        index.terms = {term: tuple(span) for term, span in header['terms'].items()}
+
+        postings_count = sum(length for _, length in index.terms.values())
+        index.postings_docs = np.frombuffer(data, dtype='<u4', count=postings_count, offset=pos)
+        index.postings_impacts = np.frombuffer(data, dtype='<f4', count=postings_count,
+                                               offset=pos + 4 * postings_count)
+        return index
+
+
+def load_catalog(paths):
+    """Load and concatenate product lists from JSON files that exist"""
+    documents = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                documents.extend(json.load(f))
+    return documents
+
+
+def catalog_signature(paths):
+    """Size and mtime of each existing catalog file, to detect a stale index"""
+    signature = {}
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature[path] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def benchmark(doc_count=100000, query_count=200):
+    """Time queries against a synthetic catalog built from the real products"""
+    seed_docs = load_catalog(['kb_english_products.json', 'kb_bengali_products.json', 'products_data.json'])
+    if not seed_docs:
+        print("No product files found to seed the benchmark")
+        return
+
+    documents = []
+    for i in range(doc_count):
+        doc = dict(seed_docs[i % len(seed_docs)])
+        doc['product_id'] = f"BENCH-{i:06d}"
+        # Give every copy a unique token so postings are not all identical
+        doc['product_tags'] = list(doc.get('product_tags', [])) + [f"lot{i % 997}"]
+        documents.append(doc)
+
+    start = time.perf_counter()
+    index = BM25Index().build(documents)
+    build_seconds = time.perf_counter() - start
+
+    queries = ['hopperburn', 'yellowing of leaves', 'rice bph', 'late blight potato', 'হপার বার্ন', 'lot42 stem borer']
+    index.search(queries[0])
+    start = time.perf_counter()
+    for i in range(query_count):
+        index.search(queries[i % len(queries)])
+    per_query_ms = (time.perf_counter() - start) / query_count * 1000
+
+    print(f"=== BM25 BENCHMARK ===")
+    print(f"Documents: {doc_count}")
+    print(f"Terms: {len(index.terms)}")
+    print(f"Postings: {len(index.postings_docs)}")
+    print(f"Build time: {build_seconds:.2f}s")
+    print(f"Average query time: {per_query_ms:.3f} ms")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        benchmark()
+        return
+
+    index_path = 'search_index.bin'
+    catalog = ['kb_english_products.json', 'kb_bengali_products.json', 'products_data.json']
+
+    signature = catalog_signature(catalog)
+    index = BM25Index.load(index_path) if os.path.exists(index_path) else None
+    if index is None or index.source != signature:
+        documents = load_catalog(catalog)
+        print(f"Indexing {len(documents)} products...")
+        index = BM25Index().build(documents)
+        index.source = signature
+        index.save(index_path)
+        print(f"Index saved to '{index_path}' ({os.path.getsize(index_path)} bytes)")
+
+    query = ' '.join(sys.argv[1:]) or 'hopperburn'
+    start = time.perf_counter()
+    results = index.search(query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n=== RESULTS FOR '{query}' ({elapsed_ms:.3f} ms) ===")
+    for rank, (doc_key, doc_name, score) in enumerate(results, 1):
+        print(f"{rank}. {doc_key} - {doc_name} ({score:.3f})")
+    if not results:
+        print("No matching products found")
+
+
+if __name__ == "__main__":
+    main()
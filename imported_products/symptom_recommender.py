@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Symptom-to-Product Recommender
+Ranks KB products against a farmer's free-text symptom description.
+
+Every crop/pest entry of kb.json (pest name, symptoms and causes) becomes a
+row of a character n-gram TF-IDF sparse matrix. A batch of queries is
+vectorized the same way and scored against all entries with one sparse
+matrix multiply; entry scores are then max-pooled onto (crop, product)
+pairs, so thousands of helpline queries are answered in one shot.
+
+Usage:
+    python symptom_recommender.py "leaves turning yellow and drying" [crop]
+"""
+
+import json
+import re
+import sys
+import time
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+
+from text_normalization import normalize_text
+
+NGRAM_RANGE = (3, 5)
+DEFAULT_TOP_K = 5
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _char_ngrams(text, ngram_range=NGRAM_RANGE):
+    """Character n-grams of each word, padded with spaces at the word boundaries"""
+    text = unicodedata.normalize('NFC', text).lower()
+    text = _WHITESPACE_RE.sub(' ', text).strip()
+    grams = []
+    for word in text.split(' '):
+        padded = f" {word} "
+        for n in range(ngram_range[0], ngram_range[1] + 1):
+            grams.extend(padded[i:i + n] for i in range(max(len(padded) - n + 1, 1)))
+    return grams
+
+
+class SymptomRecommender:
+    def __init__(self, ngram_range=NGRAM_RANGE):
+        self.ngram_range = ngram_range
+        self.vocabulary = {}
+        self.idf = None
+        self.matrix = None
+
+        # One row per KB crop/pest entry
+        self.entry_crops = []
+        self.entry_pests = []
+
+        # (crop, product) units and the entry -> unit links
+        self.units = []
+        self.unit_crops = None
+        self.link_entries = None
+        self.link_units = None
+
+    @staticmethod
+    def _entry_text(pest_entry):
+        return ' '.join(pest_entry.get(field, '') for field in ('pest', 'symptoms', 'causes'))
+
+    def _vectorize(self, texts, grow=False):
+        """Build an L2-normalized sublinear-TF CSR matrix for texts"""
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            counts = defaultdict(int)
+            for gram in _char_ngrams(text, self.ngram_range):
+                column = self.vocabulary.get(gram)
+                if column is None and grow:
+                    column = self.vocabulary[gram] = len(self.vocabulary)
+                if column is not None:
+                    counts[column] += 1
+            indices.extend(counts.keys())
+            data.extend(1.0 + np.log(list(counts.values())) if counts else [])
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(texts), len(self.vocabulary)),
+        )
+        if self.idf is not None:
+            matrix = matrix @ sparse.diags(self.idf)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ matrix
+
+    def build(self, kb_data):
+        """Build the TF-IDF matrix and product links from parsed kb.json"""
+        texts = []
+        unit_ids = {}
+        links = []
+        for crop_name, crop_data in kb_data.items():
+            if not isinstance(crop_data, list):
+                continue
+            for pest_entry in crop_data:
+                entry = len(texts)
+                texts.append(self._entry_text(pest_entry))
+                self.entry_crops.append(crop_name)
+                self.entry_pests.append(pest_entry.get('pest', ''))
+                for product in pest_entry.get('products', []):
+                    product_name = ' '.join(product.get('product_name', '').split())
+                    if not product_name:
+                        continue
+                    unit = (crop_name, product_name)
+                    if unit not in unit_ids:
+                        unit_ids[unit] = len(self.units)
+                        self.units.append(unit)
+                    links.append((entry, unit_ids[unit]))
+
+        raw = self._vectorize(texts, grow=True)
+        df = np.bincount(raw.indices, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + len(texts)) / (1 + df)) + 1.0
+        self.matrix = self._vectorize(texts).T.tocsr()
+
+        self.unit_crops = np.array([normalize_text(crop) for crop, _ in self.units], dtype=object)
+        self.link_entries = np.array([entry for entry, _ in links], dtype=np.int64)
+        self.link_units = np.array([unit for _, unit in links], dtype=np.int64)
+        return self
+
+    def score(self, queries):
+        """
+        Score a batch of queries against every (crop, product) unit.
+
+        Returns:
+            tuple: (unit scores of shape (queries, units), best entry per unit)
+        """
+        query_matrix = self._vectorize(queries)
+        entry_scores = np.asarray((query_matrix @ self.matrix).todense())
+
+        link_scores = entry_scores[:, self.link_entries]
+        unit_scores = np.zeros((len(queries), len(self.units)))
+        np.maximum.at(unit_scores.T, self.link_units, link_scores.T)
+
+        # Remember which entry gave each unit its score (for explaining the pest)
+        best_entry = np.full((len(queries), len(self.units)), -1, dtype=np.int64)
+        is_best = link_scores >= unit_scores[:, self.link_units]
+        query_rows, link_columns = np.nonzero(is_best)
+        best_entry[query_rows, self.link_units[link_columns]] = self.link_entries[link_columns]
+        return unit_scores, best_entry
+
+    def recommend(self, queries, crops=None, top_k=DEFAULT_TOP_K):
+        """
+        Rank products for a batch of symptom descriptions.
+
+        Args:
+            queries (list): Free-text symptom descriptions
+            crops (str or list): Crop to restrict every query to, or one crop (or None) per query
+            top_k (int): Products returned per query
+
+        Returns:
+            list: For each query, a list of (crop, product_name, pest, score) tuples
+        """
+        if isinstance(queries, str):
+            queries = [queries]
+        if crops is None or isinstance(crops, str):
+            crops = [crops] * len(queries)
+
+        k = min(top_k, len(self.units))
+        if not queries or k <= 0:
+            return [[] for _ in queries]
+
+        unit_scores, best_entry = self.score(queries)
+
+        for row, crop in enumerate(crops):
+            if crop:
+                unit_scores[row, self.unit_crops != normalize_text(crop)] = 0.0
+
+        top_units = np.argpartition(-unit_scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, units in enumerate(top_units):
+            ranked = sorted(units, key=lambda unit: -unit_scores[row, unit])
+            results.append([
+                (self.units[unit][0], self.units[unit][1],
+                 self.entry_pests[best_entry[row, unit]], float(unit_scores[row, unit]))
+                for unit in ranked
+                if unit_scores[row, unit] > 0
+            ])
+        return results
+
+
+def main():
+    with open('kb.json', 'r', encoding='utf-8') as f:
+        kb_data = json.load(f)
+
+    start = time.perf_counter()
+    recommender = SymptomRecommender().build(kb_data)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Indexed {len(recommender.entry_crops)} KB entries, {len(recommender.vocabulary)} n-grams, "
+          f"{len(recommender.units)} crop/product pairs in {build_ms:.1f} ms")
+
+    query = sys.argv[1] if len(sys.argv) > 1 else 'hopper burn, plants turning yellow and brown'
+    crop = sys.argv[2] if len(sys.argv) > 2 else None
+
+    start = time.perf_counter()
+    results = recommender.recommend([query], crops=crop)[0]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n=== RECOMMENDATIONS FOR '{query}'{f' ON {crop}' if crop else ''} ({elapsed_ms:.2f} ms) ===")
+    for rank, (crop_name, product_name, pest, score) in enumerate(results, 1):
+        print(f"{rank}. {product_name} - {crop_name} / {pest} ({score:.3f})")
+    if not results:
+        print("No matching KB entries found")
+
+    # Batch throughput on repeated helpline-style queries
+    batch = [query] * 2000
+    start = time.perf_counter()
+    recommender.recommend(batch, crops=crop)
+    batch_seconds = time.perf_counter() - start
+    print(f"\nScored a batch of {len(batch)} queries in {batch_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Text Normalization Engine
+Shared helpers for normalizing product and common names before comparison.
+
+Patterns are compiled once at import time and normalized forms are kept in a
+bounded LRU memo, so every distinct string is normalized only once per run no
+matter how many pairs it takes part in.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Upper bound on memoized strings per helper (the KB has a few hundred names)
+NORMALIZATION_CACHE_SIZE = 8192
+
+# Pesticide formulation codes that are dropped when comparing names
+FORMULATION_CODES = ('wdg', 'ec', 'wp', 'sl', 'sp', 'wg', 'sc', 'gr', 'df', 'se', 'ew', 'od', 'sg')
+
+# Anything that is not a word character, whitespace or Bengali script
+# (Bengali vowel signs are combining marks and would otherwise be stripped)
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\u0980-\u09FF]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# A whole token that is a formulation code, optionally glued to its
+# concentration ("ec", "20ec", "70wg")
+_FORMULATION_TOKEN_RE = re.compile(r'(\d*)(?:' + '|'.join(FORMULATION_CODES) + r')')
+
+# File extensions dropped when a file name is used as a product name
+_FILE_EXTENSION_RE = re.compile(r'\.(?:json|jpe?g|png|gif|bmp|tiff?|webp)$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _normalize(text):
+    text = unicodedata.normalize('NFC', text).lower()
+    # Remove special characters and extra spaces
+    text = _SPECIAL_CHARS_RE.sub(' ', text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def normalize_text(text):
+    """Normalize text for comparison - remove special characters, convert to lowercase"""
+    if not text:
+        return ""
+    return _normalize(text)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _strip_formulation_codes(text):
+    tokens = []
+    for token in _normalize(text).split():
+        match = _FORMULATION_TOKEN_RE.fullmatch(token)
+        if match:
+            # Keep the concentration of "20ec", drop a bare "ec"
+            token = match.group(1)
+        if token:
+            tokens.append(token)
+    return ' '.join(tokens)
+
+
+def clean_for_variant_check(text):
+    """Normalize text and drop formulation codes (EC, WP, SL, WDG...) token by token"""
+    if not text:
+        return ""
+    return _strip_formulation_codes(text)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _name_key(text):
+    text = _FILE_EXTENSION_RE.sub('', text.strip()).replace('_', ' ')
+    return _strip_formulation_codes(text).replace(' ', '')
+
+
+def name_key(text):
+    """Compact matching key for a product or file name ("ACTIVER_25_EC.json" -> "activer25")"""
+    if not text:
+        return ""
+    return _name_key(text)
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _variant_words(text):
+    return frozenset(_strip_formulation_codes(text).split())
+
+
+def is_english_bangla_variant(text1, text2):
+    """Check if two texts are English-Bangla variants of the same product"""
+    clean1 = clean_for_variant_check(text1)
+    clean2 = clean_for_variant_check(text2)
+
+    # If one is significantly shorter and contained in the other, might be variant
+    if len(clean1) > len(clean2) * 2 or len(clean2) > len(clean1) * 2:
+        return False
+
+    # Check if they share significant common words (at least 60% similarity)
+    words1 = _variant_words(text1) if text1 else frozenset()
+    words2 = _variant_words(text2) if text2 else frozenset()
+
+    if not words1 or not words2:
+        return False
+
+    common_words = words1 & words2
+    similarity = len(common_words) / max(len(words1), len(words2))
+
+    # If similarity is high but not identical, might be English-Bangla variant
+    return 0.6 <= similarity < 1.0
+
+
+def normalization_cache_info():
+    """Return hit/miss statistics for the normalization memo"""
+    return {
+        'normalize_text': _normalize.cache_info()._asdict(),
+        'clean_for_variant_check': _strip_formulation_codes.cache_info()._asdict(),
+        'name_key': _name_key.cache_info()._asdict(),
+    }
+
+
+def clear_normalization_cache():
+    """Drop all memoized normalized forms"""
+    _normalize.cache_clear()
+    _strip_formulation_codes.cache_clear()
+    _name_key.cache_clear()
+    _variant_words.cache_clear()
@@ -1,14 +1,23 @@
 import os
-import shutil
-from PIL import Image
-import glob
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'imported_products'))
+from auto_trim import parse_trim_args
+from budget_encoder import FORMAT_EXTENSIONS, parse_output_args, write_encoding_report
+from resize_engine import find_images, parse_max_pixels, parse_memory_limit, print_report, resize_images
 
 def process_images():
     """
     Process images by:
     1. Removing '.jpg' from filenames
-    2. Resizing to 512x512 pixels
-    3. Saving to a new folder
+    2. Resizing to 512x512 pixels on a white background
+    3. Saving to a new folder (as PNG, or budgeted WebP/AVIF with --webp/--avif,
+       --max-kb N, --min-ssim X)
+    
+    --memory-mb N caps the RAM all workers together use for decoded images
+    (larger images are skipped), --max-pixels N skips sources with more
+    pixels than that, and
+    --trim [--trim-margin F] crops the white field around the product first.
     """
     
     # Create output directory
@@ -18,7 +27,7 @@ def process_images():
         print(f"Created directory: {output_dir}")
     
     # Get all PNG files in current directory
-    image_files = glob.glob("*.png")
+    image_files = find_images(".", extensions=('.png',), recursive=False)
     
     if not image_files:
         print("No PNG files found in the current directory.")
@@ -26,40 +35,26 @@ def process_images():
     
     print(f"Found {len(image_files)} PNG files to process...")
     
-    processed_count = 0
+    output_options = parse_output_args(sys.argv[1:]) or {'image_format': 'PNG'}
+    extension = FORMAT_EXTENSIONS.get(output_options['image_format'], '.png')
     
+    # Remove '.jpg' from filename if it exists
+    jobs = []
     for image_file in image_files:
-        try:
-            # Remove '.jpg' from filename if it exists
-            new_filename = image_file.replace('.jpg', '')
-            
-            # Open the image
-            with Image.open(image_file) as img:
-                # Convert to RGB if necessary (for PNG with transparency)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # Create a white background
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Resize to 512x512
-                resized_img = img.resize((512, 512), Image.Resampling.LANCZOS)
-                
-                # Save to output directory
-                output_path = os.path.join(output_dir, new_filename)
-                resized_img.save(output_path, 'PNG', quality=95)
-                
-                print(f"Processed: {image_file} -> {new_filename} (512x512)")
-                processed_count += 1
-                
-        except Exception as e:
-            print(f"Error processing {image_file}: {str(e)}")
+        name, _ = os.path.splitext(os.path.basename(image_file).replace('.jpg', ''))
+        jobs.append((image_file, os.path.join(output_dir, name + extension)))
+    
+    stats = resize_images(jobs, size=(512, 512), background=(255, 255, 255),
+                          manifest_path=os.path.join(output_dir, '.build_manifest.json'),
+                          memory_limit_mb=parse_memory_limit(sys.argv[1:]),
+                          max_pixels=parse_max_pixels(sys.argv[1:]),
+                          trim=parse_trim_args(sys.argv[1:]),
+                          **output_options)
+    print_report(stats, output_dir)
     
-    print(f"\nProcessing complete! {processed_count} images processed and saved to '{output_dir}' folder.")
+    if stats['encodings']:
+        write_encoding_report(stats, 'encoding_report.json')
+        print(f"Size/quality report saved to: encoding_report.json")
 
 if __name__ == "__main__":
     process_images()